@@ -5,9 +5,45 @@ Handles SQLite database operations
 
 import sqlite3
 import os
+import threading
 from datetime import datetime
+from functools import wraps
 from pathlib import Path
 
+# Applied once when the shared connection is opened
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",  # Read pages through a 256 MB memory map
+)
+
+# Scanner lookup queries; kept as constants so the shared connection's
+# statement cache reuses the prepared statements
+PRODUCT_BY_BARCODE_SQL = '''
+    SELECT p.id, p.name, p.sku, p.barcode, p.category_id, p.cogs, p.current_stock
+    FROM products p
+    WHERE p.barcode = ? OR p.sku = ?
+    LIMIT 1
+'''
+PRODUCT_BY_BARCODE_NOCASE_SQL = '''
+    SELECT p.id, p.name, p.sku, p.barcode, p.category_id, p.cogs, p.current_stock
+    FROM products p
+    WHERE UPPER(p.barcode) = UPPER(?) OR UPPER(p.sku) = UPPER(?)
+    LIMIT 1
+'''
+
+
+def _synchronized(method):
+    """Serialize access to the shared connection across threads"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class DatabaseManager:
     """Manages SQLite database operations"""
 
@@ -21,22 +57,58 @@ class DatabaseManager:
 
         self.connection = None
         self.cursor = None
+        self._lock = threading.RLock()
 
+    @_synchronized
     def connect(self):
-        """Connect to database"""
+        """Connect to database, reusing the shared connection once it is open"""
+        if self.connection is not None:
+            return True
+
         try:
-            self.connection = sqlite3.connect(str(self.db_path))
+            # UI and worker threads share this connection; _synchronized guards it
+            self.connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            for pragma in CONNECTION_PRAGMAS:
+                self.connection.execute(pragma)
             self.cursor = self.connection.cursor()
             return True
         except Exception as e:
             print(f"Database connection error: {e}")
+            self.connection = None
             return False
 
+    @_synchronized
     def disconnect(self):
-        """Close database connection"""
-        if self.connection:
+        """Finish the current operation, keeping the shared connection open"""
+        if self.connection is not None and self.connection.in_transaction:
+            self.connection.rollback()  # Discard anything left uncommitted
+
+    @_synchronized
+    def close(self):
+        """Close the shared database connection"""
+        if self.connection is not None:
             self.connection.close()
+            self.connection = None
+            self.cursor = None
+
+    @_synchronized
+    def change_token(self):
+        """Return a value that changes whenever the database is written
+
+        Combines this connection's total_changes with PRAGMA data_version,
+        which moves when another connection commits. None if unavailable.
+        """
+        if not self.connect():
+            return None
+
+        try:
+            data_version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+            return (data_version, self.connection.total_changes)
+        except Exception as e:
+            print(f"Error reading database change token: {e}")
+            return None
 
+    @_synchronized
     def initialize_database(self):
         """Create database tables if they don't exist"""
         if not self.connect():
@@ -118,6 +190,7 @@ class DatabaseManager:
             self.disconnect()
 
     # Category operations
+    @_synchronized
     def get_categories(self):
         """Get all categories"""
         if not self.connect():
@@ -132,6 +205,7 @@ class DatabaseManager:
         finally:
             self.disconnect()
 
+    @_synchronized
     def add_category(self, name, description=""):
         """Add new category"""
         if not self.connect():
@@ -153,6 +227,7 @@ class DatabaseManager:
             self.disconnect()
 
     # Product operations
+    @_synchronized
     def add_product(self, name, sku, barcode, category_id, cogs, initial_stock):
         """Add new product"""
         if not self.connect():
@@ -174,6 +249,37 @@ class DatabaseManager:
         finally:
             self.disconnect()
 
+    @_synchronized
+    def add_products_bulk(self, rows):
+        """Add several products in a single transaction
+
+        rows: iterable of (name, sku, barcode, category_id, cogs, initial_stock).
+        Rows whose SKU or barcode already exists are skipped, as add_product
+        would reject them. Returns the number of products added.
+        """
+        if not self.connect():
+            return 0
+
+        try:
+            current_time = datetime.now().isoformat()
+            self.cursor.executemany('''
+                INSERT OR IGNORE INTO products (name, sku, barcode, category_id, cogs, initial_stock, current_stock, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [(name, sku, barcode, category_id, cogs, stock, stock, current_time)
+                  for name, sku, barcode, category_id, cogs, stock in rows])
+            self.connection.commit()
+            return self.cursor.rowcount
+        except Exception as e:
+            print(f"Error adding products: {e}")
+            try:
+                self.connection.rollback()
+            except:
+                pass
+            return 0
+        finally:
+            self.disconnect()
+
+    @_synchronized
     def update_product_barcode(self, product_id, barcode):
         """Update product barcode"""
         if not self.connect():
@@ -194,6 +300,35 @@ class DatabaseManager:
         finally:
             self.disconnect()
 
+    @_synchronized
+    def update_product_barcodes(self, updates):
+        """Update barcodes for several products in a single transaction
+
+        updates: iterable of (product_id, barcode) pairs
+        """
+        if not self.connect():
+            return False
+
+        try:
+            current_time = datetime.now().isoformat()
+            self.cursor.executemany('''
+                UPDATE products 
+                SET barcode = ?, updated_at = ?
+                WHERE id = ?
+            ''', [(barcode, current_time, product_id) for product_id, barcode in updates])
+            self.connection.commit()
+            return True
+        except Exception as e:
+            print(f"Error updating product barcodes: {e}")
+            try:
+                self.connection.rollback()
+            except:
+                pass
+            return False
+        finally:
+            self.disconnect()
+
+    @_synchronized
     def update_product(self, product_id, name, sku, barcode, category_id, cogs):
         """Update product information"""
         if not self.connect():
@@ -216,6 +351,7 @@ class DatabaseManager:
         finally:
             self.disconnect()
 
+    @_synchronized
     def delete_product(self, product_id):
         """Delete product"""
         if not self.connect():
@@ -238,6 +374,7 @@ class DatabaseManager:
         finally:
             self.disconnect()
 
+    @_synchronized
     def get_products(self, category_id=None):
         """Get all products or products by category"""
         if not self.connect():
@@ -267,6 +404,28 @@ class DatabaseManager:
         finally:
             self.disconnect()
 
+    @_synchronized
+    def get_products_with_qr(self):
+        """Get products that have a non-empty QR code/barcode"""
+        if not self.connect():
+            return []
+
+        try:
+            self.cursor.execute('''
+                SELECT id, name, sku, barcode
+                FROM products
+                WHERE barcode IS NOT NULL AND TRIM(barcode) != ''
+                ORDER BY name
+            ''')
+
+            return self.cursor.fetchall()
+        except Exception as e:
+            print(f"Error getting products with QR codes: {e}")
+            return []
+        finally:
+            self.disconnect()
+
+    @_synchronized
     def get_product_by_id(self, product_id):
         """Get full product record by ID, including initial and current stock"""
         if not self.connect():
@@ -287,6 +446,7 @@ class DatabaseManager:
         finally:
             self.disconnect()
 
+    @_synchronized
     def update_product_initial_stock(self, product_id, new_initial_stock):
         """Update product initial_stock and align current_stock if current < 1 and there is no sales record.
 
@@ -312,6 +472,7 @@ class DatabaseManager:
         finally:
             self.disconnect()
 
+    @_synchronized
     def get_product_by_barcode(self, barcode):
         """Get product by barcode"""
         if not self.connect():
@@ -319,11 +480,7 @@ class DatabaseManager:
 
         try:
             # First try exact barcode match
-            self.cursor.execute('''
-                SELECT p.id, p.name, p.sku, p.barcode, p.category_id, p.cogs, p.current_stock
-                FROM products p
-                WHERE p.barcode = ? OR p.sku = ?
-            ''', (barcode, barcode))
+            self.cursor.execute(PRODUCT_BY_BARCODE_SQL, (barcode, barcode))
 
             result = self.cursor.fetchone()
             
@@ -332,11 +489,7 @@ class DatabaseManager:
                 return result
             
             # If not found, try case-insensitive search
-            self.cursor.execute('''
-                SELECT p.id, p.name, p.sku, p.barcode, p.category_id, p.cogs, p.current_stock
-                FROM products p
-                WHERE UPPER(p.barcode) = UPPER(?) OR UPPER(p.sku) = UPPER(?)
-            ''', (barcode, barcode))
+            self.cursor.execute(PRODUCT_BY_BARCODE_NOCASE_SQL, (barcode, barcode))
 
             result = self.cursor.fetchone()
             if result:
@@ -351,6 +504,7 @@ class DatabaseManager:
         finally:
             self.disconnect()
 
+    @_synchronized
     def update_stock(self, product_id, new_stock):
         """Update product stock to new value"""
         if not self.connect():
@@ -371,103 +525,93 @@ class DatabaseManager:
         finally:
             self.disconnect()
 
-    def update_stock_change(self, product_id, quantity_change, operation="stock_in"):
-        """Update product stock (positive for stock_in, negative for stock_out/sale)"""
+    @_synchronized
+    def apply_stock_delta(self, product_id, delta):
+        """Add delta (negative to remove) to a product's stock in a single UPDATE
+
+        The stock check happens in the WHERE clause, so concurrent writers can't
+        drive stock negative. Returns the new stock, or None if the product is
+        missing or has insufficient stock.
+        """
         if not self.connect():
-            return False
+            return None
 
         try:
-            # Start transaction
-            self.connection.execute('BEGIN EXCLUSIVE')
-
-            if operation == "stock_out" and quantity_change > 0:
-                quantity_change = -quantity_change
-
-            # Get current stock first
-            self.cursor.execute('SELECT current_stock FROM products WHERE id=?', (product_id,))
-            result = self.cursor.fetchone()
-            if not result:
-                print(f"Product with ID {product_id} not found")
-                self.connection.rollback()
-                return False
-
-            current_stock = result[0]
-            new_stock = current_stock + quantity_change
-
-            # Ensure stock doesn't go negative
-            if new_stock < 0:
-                print(f"Insufficient stock for product {product_id}. Current: {current_stock}, Requested change: {quantity_change}")
-                self.connection.rollback()
-                return False
-
             self.cursor.execute('''
                 UPDATE products
-                SET current_stock = ?, updated_at = ?
-                WHERE id = ?
-            ''', (new_stock, datetime.now().isoformat(), product_id))
+                SET current_stock = current_stock + ?, updated_at = ?
+                WHERE id = ? AND current_stock + ? >= 0
+            ''', (delta, datetime.now().isoformat(), product_id, delta))
+            if self.cursor.rowcount == 0:
+                self.connection.rollback()
+                return None
 
+            # Same transaction as the UPDATE, so this is the value just written
+            self.cursor.execute('SELECT current_stock FROM products WHERE id=?', (product_id,))
+            new_stock = self.cursor.fetchone()[0]
             self.connection.commit()
-            return True
+            return new_stock
         except Exception as e:
             print(f"Error updating stock: {e}")
             try:
                 self.connection.rollback()
             except:
                 pass
-            return False
+            return None
         finally:
-            try:
-                self.disconnect()
-            except:
-                pass
+            self.disconnect()
+
+    @_synchronized
+    def update_stock_change(self, product_id, quantity_change, operation="stock_in"):
+        """Update product stock (positive for stock_in, negative for stock_out/sale)"""
+        if operation == "stock_out" and quantity_change > 0:
+            quantity_change = -quantity_change
+
+        if self.apply_stock_delta(product_id, quantity_change) is None:
+            print(f"Stock change of {quantity_change} rejected for product {product_id} (missing or insufficient stock)")
+            return False
+        return True
 
     # Sales operations
+    @_synchronized
     def add_sale(self, product_id, quantity, selling_price, sale_date):
-        """Add new sale record"""
+        """Add new sale record
+
+        Returns the product's stock after the sale, or None if the sale was
+        rejected (missing product, insufficient stock or a database error).
+        """
         if not self.connect():
             print("Failed to connect to database")
-            return False
+            return None
 
         try:
-            # Start transaction
-            self.connection.execute('BEGIN EXCLUSIVE')
-
-            # Get product COGS
-            self.cursor.execute('SELECT cogs, current_stock FROM products WHERE id=?', (product_id,))
-            result = self.cursor.fetchone()
-            if not result:
-                print(f"Product with ID {product_id} not found")
-                self.connection.rollback()
-                return False
-
-            cogs, current_stock = result
+            revenue = quantity * selling_price
 
-            # Check if enough stock is available
-            if current_stock < quantity:
-                print(f"Insufficient stock. Available: {current_stock}, Requested: {quantity}")
+            # Stock check and decrement in one guarded UPDATE (as apply_stock_delta);
+            # no rows means the product is missing or short of stock
+            self.cursor.execute('''
+                UPDATE products SET current_stock = current_stock - ?, updated_at = ?
+                WHERE id = ? AND current_stock >= ?
+            ''', (quantity, datetime.now().isoformat(), product_id, quantity))
+            if self.cursor.rowcount == 0:
+                print(f"Cannot sell {quantity} of product {product_id}: not found or insufficient stock")
                 self.connection.rollback()
-                return False
+                return None
 
-            revenue = quantity * selling_price
-            profit = quantity * (selling_price - cogs)
-
-            # Insert sale record
+            # Insert sale record, taking profit from the product's COGS in the same statement
             self.cursor.execute('''
                 INSERT INTO sales (product_id, quantity, selling_price, revenue, profit, sale_date)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (product_id, quantity, selling_price, revenue, profit, sale_date))
+                SELECT id, ?, ?, ?, ? * (? - cogs), ? FROM products WHERE id = ?
+            ''', (quantity, selling_price, revenue, quantity, selling_price, sale_date, product_id))
 
-            # Update stock
-            new_stock = current_stock - quantity
-            self.cursor.execute('''
-                UPDATE products SET current_stock = ?, updated_at = ?
-                WHERE id = ?
-            ''', (new_stock, datetime.now().isoformat(), product_id))
+            # Same transaction as the UPDATE, so this is the value just written
+            self.cursor.execute('SELECT current_stock FROM products WHERE id=?', (product_id,))
+            new_stock = self.cursor.fetchone()[0]
 
             # Commit transaction
             self.connection.commit()
             print(f"Successfully added sale: {quantity} x {selling_price} = PKR {revenue}")
-            return True
+            return new_stock
 
         except Exception as e:
             print(f"Error adding sale: {e}")
@@ -475,13 +619,14 @@ class DatabaseManager:
                 self.connection.rollback()
             except:
                 pass
-            return False
+            return None
         finally:
             try:
                 self.disconnect()
             except:
                 pass
 
+    @_synchronized
     def get_sales(self, start_date=None, end_date=None, category_id=None):
         """Get sales records with optional filters"""
         if not self.connect():
@@ -525,6 +670,7 @@ class DatabaseManager:
         finally:
             self.disconnect()
 
+    @_synchronized
     def delete_sale(self, sale_id):
         """Delete sale record and restore stock"""
         if not self.connect():
@@ -577,6 +723,7 @@ class DatabaseManager:
             self.disconnect()
 
     # Analytics functions
+    @_synchronized
     def get_dashboard_stats(self, category_id=None):
         """Get dashboard statistics"""
         if not self.connect():
@@ -629,6 +776,7 @@ class DatabaseManager:
         finally:
             self.disconnect()
 
+    @_synchronized
     def get_top_selling_products(self, limit=5, category_id=None):
         """Get top selling products"""
         if not self.connect():
@@ -662,6 +810,7 @@ class DatabaseManager:
         finally:
             self.disconnect()
 
+    @_synchronized
     def get_profit_trend(self, days=30, category_id=None):
         """Get profit trend data"""
         if not self.connect():
@@ -694,6 +843,7 @@ class DatabaseManager:
         finally:
             self.disconnect()
 
+    @_synchronized
     def get_category_performance(self):
         """Get performance by category"""
         if not self.connect():
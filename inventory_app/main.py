@@ -27,6 +27,7 @@ def main():
         # Initialize database
         db_manager = DatabaseManager()
         db_manager.initialize_database()
+        db_manager.close()  # MainWindow opens its own; don't hold the file open
 
         # Create and run main window
         app = MainWindow()
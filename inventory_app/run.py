@@ -41,6 +41,7 @@ def main():
     # Initialize database
     db_manager = DatabaseManager()
     db_manager.initialize_database()
+    db_manager.close()  # MainWindow opens its own; don't hold the file open
 
     # Generate sample data if requested
     if args.sample_data:
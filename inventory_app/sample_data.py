@@ -25,6 +25,9 @@ class SampleDataGenerator:
         # Generate sample sales
         self.generate_sample_sales()
 
+        # Release the file; the app's own manager reopens it
+        self.db_manager.close()
+
         print("Sample data generation completed!")
 
     def generate_sample_products(self):
@@ -86,12 +89,14 @@ class SampleDataGenerator:
             (set_n_forget_products, "Set N Forget")
         ]
 
+        rows = []
         for products, category_name in product_lists:
             category_id = category_map.get(category_name)
             if category_id:
                 for product in products:
                     name, sku, barcode, cogs, stock = product
-                    self.db_manager.add_product(name, sku, barcode, category_id, cogs, stock)
+                    rows.append((name, sku, barcode, category_id, cogs, stock))
+        self.db_manager.add_products_bulk(rows)
 
         print(f"Added {len(lash_products) + len(nail_products) + len(sponge_products) + len(set_n_forget_products)} sample products")
 
@@ -5,31 +5,34 @@ Test the production barcode scanner functionality
 
 import sys
 import os
-import cv2
-import numpy as np
+from functools import lru_cache
 
 # Add the current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from utils.console_output import Printer
+
 def test_production_scanner():
     """Test the production barcode scanner"""
-    print("🚀 Testing Production Barcode Scanner")
-    print("=" * 60)
-    
     try:
-        from utils.production_barcode_scanner import ProductionBarcodeScanner
-        
-        # Initialize scanner
-        scanner = ProductionBarcodeScanner()
-        
-        # Get status
-        status = scanner.get_scanner_status()
-        
-        print("📊 Scanner Status:")
-        for key, value in status.items():
-            print(f"   ✅ {key}: {value}")
-        
-        print(f"\n🎯 Recommended method: {status['recommended_method']}")
+        with Printer() as p:
+            p("🚀 Testing Production Barcode Scanner")
+            p("=" * 60)
+            p.flush()  # The import and constructor print library status themselves
+            
+            from utils.production_barcode_scanner import ProductionBarcodeScanner
+            
+            # Initialize scanner
+            scanner = ProductionBarcodeScanner()
+            
+            # Get status
+            status = scanner.get_scanner_status()
+            
+            p("📊 Scanner Status:")
+            for key, value in status.items():
+                p(f"   ✅ {key}: {value}")
+            
+            p(f"\n🎯 Recommended method: {status['recommended_method']}")
         
         # Test with synthetic barcode image
         test_synthetic_barcode(scanner)
@@ -69,24 +72,29 @@ def test_synthetic_barcode(scanner):
     except Exception as e:
         print(f"❌ Synthetic barcode test error: {e}")
 
+@lru_cache(maxsize=32)
+def _bar_cols(n, width):
+    """Column indices of each bar, one row per digit position"""
+    import numpy as np
+    
+    bar_width = width // n
+    return np.stack([np.arange(i * bar_width, i * bar_width + bar_width // 2 + 1) for i in range(n)])
+
 def create_synthetic_barcode(data):
     """Create a simple synthetic barcode image"""
     try:
+        import numpy as np
+        
         # Create a simple barcode pattern
         width = 400
         height = 100
         
-        # Create white background
-        img = np.ones((height, width, 3), dtype=np.uint8) * 255
+        # Create white single-channel background (scanners work in grayscale)
+        img = np.full((height, width), 255, dtype=np.uint8)
         
-        # Add black bars (simple pattern)
-        bar_width = width // len(data)
-        
-        for i, digit in enumerate(data):
-            x = i * bar_width
-            # Make bars based on digit value
-            if int(digit) % 2 == 0:  # Even digits get thick bars
-                cv2.rectangle(img, (x, 20), (x + bar_width//2, height-20), (0, 0, 0), -1)
+        # Add black bars (simple pattern) - even digits get thick bars
+        even_mask = np.array([int(digit) % 2 == 0 for digit in data])
+        img[20:height-19, _bar_cols(len(data), width)[even_mask].ravel()] = 0
         
         return img
         
@@ -100,8 +108,16 @@ def test_camera_scanning(scanner):
     print("-" * 40)
     
     try:
-        # Try to open camera
-        camera = cv2.VideoCapture(0)
+        import cv2
+        
+        # Try to open camera with an explicit backend to skip auto-probing
+        if sys.platform == "win32":
+            backend = cv2.CAP_DSHOW
+        elif sys.platform.startswith("linux"):
+            backend = cv2.CAP_V4L2
+        else:
+            backend = cv2.CAP_ANY
+        camera = cv2.VideoCapture(0, backend)
         
         if not camera.isOpened():
             print("⚠️ Camera not available for testing")
@@ -110,11 +126,21 @@ def test_camera_scanning(scanner):
         print("✅ Camera opened successfully")
         
         # Test a few frames
+        last_hash = None
         for i in range(5):
-            ret, frame = camera.read()
+            # Drain buffered frames with the cheap grab(), then decode only the latest
+            for _ in range(2):
+                camera.grab()
+            ret, frame = camera.retrieve()
             if ret:
                 print(f"📷 Frame {i+1}: {frame.shape}")
                 
+                # Skip near-duplicate frames (cheap hash of a downsampled frame)
+                frame_hash = cv2.resize(frame, (32, 32)).mean()
+                if last_hash is not None and abs(frame_hash - last_hash) < 0.5:
+                    continue
+                last_hash = frame_hash
+                
                 # Try to scan (won't find anything without actual barcode)
                 result = scanner.scan_frame(frame)
                 if result:
@@ -131,13 +157,7 @@ def test_camera_scanning(scanner):
 
 def test_validation():
     """Test barcode validation"""
-    print("\n✅ Testing Barcode Validation")
-    print("-" * 40)
-    
     try:
-        from utils.production_barcode_scanner import ProductionBarcodeScanner
-        scanner = ProductionBarcodeScanner()
-        
         test_codes = [
             ("123456789012", "UPC-A format"),
             ("1234567890123", "EAN-13 format"),
@@ -148,10 +168,18 @@ def test_validation():
             ("VALIDCODE123", "Valid alphanumeric")
         ]
         
-        for code, description in test_codes:
-            valid = scanner._validate_barcode(code)
-            status = "✅ Valid" if valid else "❌ Invalid"
-            print(f"   {status}: {code} ({description})")
+        with Printer() as p:
+            p("\n✅ Testing Barcode Validation")
+            p("-" * 40)
+            p.flush()  # The constructor prints library status itself
+            
+            from utils.production_barcode_scanner import ProductionBarcodeScanner
+            scanner = ProductionBarcodeScanner()
+            
+            for code, description in test_codes:
+                valid = scanner._validate_barcode(code)
+                status = "✅ Valid" if valid else "❌ Invalid"
+                p(f"   {status}: {code} ({description})")
         
     except Exception as e:
         print(f"❌ Validation test error: {e}")
@@ -5,16 +5,10 @@ Test script to verify sales functionality
 
 from database.db_manager import DatabaseManager
 
-def test_database():
+def test_database(db):
     """Test database connection and product loading"""
     print("🔧 Testing Database Connection...")
 
-    db = DatabaseManager()
-
-    if not db.connect():
-        print("❌ Failed to connect to database")
-        return False
-
     # Test product loading
     try:
         products = db.get_products()
@@ -33,18 +27,11 @@ def test_database():
     except Exception as e:
         print(f"❌ Error loading products: {e}")
         return False
-    finally:
-        db.disconnect()
 
-def test_sale_simulation():
+def test_sale_simulation(db):
     """Test a sale simulation"""
     print("\n💰 Testing Sale Simulation...")
 
-    db = DatabaseManager()
-    if not db.connect():
-        print("❌ Cannot connect to database")
-        return
-
     try:
         # Get first product
         products = db.get_products()
@@ -61,24 +48,23 @@ def test_sale_simulation():
         quantity = 1
         selling_price = product[5] * 1.5  # 50% markup
 
-        success = db.add_sale(product[0], quantity, selling_price, "2024-12-19")
+        new_stock = db.add_sale(product[0], quantity, selling_price, "2024-12-19")
 
-        if success:
+        if new_stock is not None:
             print("✅ Sale added successfully!")
             print(f"   Revenue: PKR {selling_price:.2f}")
             print(f"   Profit: PKR {selling_price - product[5]:.2f}")
 
             # Check updated stock
             updated_products = db.get_products()
-            updated_product = next(p for p in updated_products if p[0] == product[0])
+            products_by_id = {p[0]: p for p in updated_products}
+            updated_product = products_by_id[product[0]]
             print(f"   Stock after: {updated_product[6]}")
         else:
             print("❌ Sale failed!")
 
     except Exception as e:
         print(f"❌ Sale simulation error: {e}")
-    finally:
-        db.disconnect()
 
 def main():
     """Main test function"""
@@ -86,11 +72,20 @@ def main():
     print("MONA BEAUTY STORE - SALES TEST")
     print("=" * 50)
 
-    # Test database
-    if test_database():
-        test_sale_simulation()
-    else:
+    db = DatabaseManager()
+    if not db.connect():
+        print("❌ Failed to connect to database")
         print("\n🔧 Please run: python fix_database.py")
+        return
+
+    try:
+        # Test database
+        if test_database(db):
+            test_sale_simulation(db)
+        else:
+            print("\n🔧 Please run: python fix_database.py")
+    finally:
+        db.disconnect()
 
     print("\n" + "=" * 50)
 
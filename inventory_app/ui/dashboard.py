@@ -232,6 +232,7 @@ class DashboardFrame:
     def populate_category_filter(self):
         """Populate category filter dropdown"""
         categories = self.db_manager.get_categories()
+        self.category_ids = {cat[1]: cat[0] for cat in categories}  # {name: category_id}
         category_names = ["All Categories"] + [cat[1] for cat in categories]
         self.category_filter['values'] = category_names
         self.category_filter.set("All Categories")
@@ -251,11 +252,7 @@ class DashboardFrame:
             selected_category = self.category_filter.get()
             category_id = None
             if selected_category != "All Categories":
-                categories = self.db_manager.get_categories()
-                for cat in categories:
-                    if cat[1] == selected_category:
-                        category_id = cat[0]
-                        break
+                category_id = self.category_ids.get(selected_category)
 
             # Update stats cards
             self.update_stats_cards(category_id)
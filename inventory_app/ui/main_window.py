@@ -55,6 +55,7 @@ class MainWindow:
 
         # Initialize frames
         self.frames = {}
+        self.current_frame = None
         self.create_frames()
 
         # Show default frame
@@ -108,8 +109,8 @@ class MainWindow:
             self.nav_buttons[frame_name] = btn
 
             # Hover effects
-            btn.bind("<Enter>", lambda e, b=btn: self.on_button_hover(e, b, True))
-            btn.bind("<Leave>", lambda e, b=btn: self.on_button_hover(e, b, False))
+            btn.bind("<Enter>", lambda e, b=btn, f=frame_name: self.on_button_hover(e, b, f, True))
+            btn.bind("<Leave>", lambda e, b=btn, f=frame_name: self.on_button_hover(e, b, f, False))
 
         # Footer
         footer_label = tk.Label(
@@ -127,13 +128,14 @@ class MainWindow:
         self.content_area.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
 
     def create_frames(self):
-        """Create all frame instances"""
-        self.frames = {
-            "dashboard": DashboardFrame(self.content_area, self.db_manager, self),
-            "products": ProductManagementFrame(self.content_area, self.db_manager, self),
-            "sales": SalesManagementFrame(self.content_area, self.db_manager, self),
-            "barcode": QRScannerFrame(self.content_area, self.db_manager)
+        """Register frame factories; each frame is built the first time it is shown"""
+        self._frame_factories = {
+            "dashboard": lambda: DashboardFrame(self.content_area, self.db_manager, self),
+            "products": lambda: ProductManagementFrame(self.content_area, self.db_manager, self),
+            "sales": lambda: SalesManagementFrame(self.content_area, self.db_manager, self),
+            "barcode": lambda: QRScannerFrame(self.content_area, self.db_manager)
         }
+        self.frames = {}
 
     def show_frame(self, frame_name):
         """Show selected frame"""
@@ -148,9 +150,14 @@ class MainWindow:
         for frame in self.frames.values():
             frame.hide()
 
+        # Create the selected frame on first use
+        if frame_name not in self.frames and frame_name in self._frame_factories:
+            self.frames[frame_name] = self._frame_factories[frame_name]()
+
         # Show selected frame
         if frame_name in self.frames:
             self.frames[frame_name].show()
+            self.current_frame = frame_name
 
     def recreate_frames(self):
         """Recreate all frames (used after DB reset)"""
@@ -162,9 +169,9 @@ class MainWindow:
                 except Exception:
                     pass
                 try:
-                    # Each frame class uses a Tk container attribute named 'frame'
-                    if hasattr(frame, 'frame'):
-                        frame.frame.destroy()
+                    # Most frame classes keep their Tk container in 'frame';
+                    # QRScannerFrame is a ttk.Frame itself
+                    getattr(frame, 'frame', frame).destroy()
                 except Exception:
                     pass
         except Exception:
@@ -175,19 +182,13 @@ class MainWindow:
         # Show dashboard by default
         self.show_frame("dashboard")
 
-    def on_button_hover(self, event, button, enter):
+    def on_button_hover(self, event, button, frame_name, enter):
         """Handle button hover effects"""
         if enter:
             button.configure(bg=self.secondary_color, fg=self.primary_color)
         else:
             # Reset to active state if button is currently selected
-            current_frame = None
-            for frame_name, btn in self.nav_buttons.items():
-                if btn == button:
-                    current_frame = frame_name
-                    break
-
-            if current_frame and hasattr(self, 'current_frame') and self.current_frame == current_frame:
+            if self.current_frame == frame_name:
                 button.configure(bg=self.secondary_color, fg=self.primary_color)
             else:
                 button.configure(bg=self.primary_color, fg=self.secondary_color)
@@ -7,6 +7,31 @@ import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 import re
 import os
+import queue
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from utils.validators import Validators
+
+# Anything str.isalnum() rejects; used to clean names for SKUs
+_NON_ALNUM_RE = re.compile(r'[\W_]+')
+
+# Row shape of db_manager.get_products(); still a tuple, so index access works
+Product = namedtuple('Product', 'id name sku barcode category cogs stock')
+
+# Treeview column -> Product field, and which columns sort as numbers
+SORT_COLUMNS = {"ID": "id", "Name": "name", "SKU": "sku", "QR Code": "barcode",
+                "Category": "category", "COGS": "cogs", "Stock": "stock"}
+NUMERIC_SORT_COLUMNS = {"ID", "COGS", "Stock"}
+
+# Extra rows inserted past the visible window so small scrolls stay smooth
+TREE_WINDOW_PADDING = 5
+# Delay before a search runs, so a burst of keystrokes filters only once
+SEARCH_DEBOUNCE_MS = 200
+# Fallback geometry used until the Treeview reports its real size
+TREE_ROW_HEIGHT = 20
+TREE_HEADING_HEIGHT = 25
 
 class ProductManagementFrame:
     """Product management frame"""
@@ -26,6 +51,28 @@ class ProductManagementFrame:
         # Create main frame
         self.frame = tk.Frame(parent, bg=self.background_color)
 
+        # Virtualized table state: only rows inside the visible window are
+        # inserted into the Treeview, the rest live in these lists
+        self._products_cache = None  # Product tuples from the DB; None means refetch
+        self._view_rows = []  # formatted table rows, parallel to the cache
+        self._haystacks = []  # lowercased searchable text, parallel to the cache
+        self._filtered = []  # formatted rows matching the current search
+        self._first_row = 0
+        self._visible_rows = 15
+        self._sort_state = {'col': None, 'desc': False}
+        self._sort_keys = {}  # column -> {product_id: sort key}, built on first use
+        self._selection_offscreen = False
+        self._search_after_id = None
+
+        # Product fetches run off the Tk thread; each load gets a new id so
+        # results from superseded loads are dropped
+        self._db_pool = ThreadPoolExecutor(max_workers=1)
+        self._load_request_id = 0
+        self._products_loading = False
+        self._fetched = queue.Queue()  # (request_id, future) from the worker, drained on the Tk thread
+        self._fetch_poll_scheduled = False
+        self.frame.bind('<Destroy>', lambda e: self._db_pool.shutdown(wait=False))
+
         # Create components
         self.create_header()
         self.create_product_form()
@@ -35,9 +82,13 @@ class ProductManagementFrame:
         # Initialize data
         self.selected_product = None
         self.categories = []
-        self.load_categories()
+        self.category_ids = {}  # {name: category_id}, rebuilt by load_categories
+        # Categories and products are loaded by show(); MainWindow builds this
+        # frame on first navigation and shows it straight away
         # Map of product_id -> full product tuple from DB (raw values)
         self.products_by_id = {}
+        # db_manager.change_token() as of the last reload in show()
+        self._seen_change_token = None
 
     def create_header(self):
         """Create header section"""
@@ -235,9 +286,15 @@ class ProductManagementFrame:
             self.tree.column(col, width=width, anchor=tk.CENTER)
 
         # Add scrollbars
-        v_scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
         h_scrollbar = ttk.Scrollbar(table_frame, orient=tk.HORIZONTAL, command=self.tree.xview)
-        self.tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        # The vertical scrollbar drives the virtual window, not the Treeview itself
+        v_scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self._on_tree_scroll)
+        self.v_scrollbar = v_scrollbar
+        self.tree.configure(xscrollcommand=h_scrollbar.set)
+        try:
+            self._row_height = int(ttk.Style().lookup("Treeview", "rowheight") or TREE_ROW_HEIGHT)
+        except (tk.TclError, ValueError):
+            self._row_height = TREE_ROW_HEIGHT
 
         # Pack tree and scrollbars
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(20, 0), pady=(0, 20))
@@ -254,6 +311,12 @@ class ProductManagementFrame:
         self.tree.bind('<Button-1>', self.on_tree_click, add='+')
         self.tree.bind('<Escape>', self.on_escape_clear_selection)
 
+        # Re-render the window when the table is resized or scrolled by wheel
+        self.tree.bind('<Configure>', self._on_tree_configure)
+        self.tree.bind('<MouseWheel>', self._on_tree_wheel)
+        self.tree.bind('<Button-4>', self._on_tree_wheel)
+        self.tree.bind('<Button-5>', self._on_tree_wheel)
+
     def create_action_buttons(self):
         """Create action buttons for selected product"""
         actions_frame = tk.Frame(self.frame, bg=self.background_color)
@@ -348,40 +411,153 @@ class ProductManagementFrame:
     def load_categories(self):
         """Load categories into combobox"""
         self.categories = self.db_manager.get_categories()
+        self.category_ids = {cat[1]: cat[0] for cat in self.categories}
         category_names = [cat[1] for cat in self.categories]
         self.category_combo['values'] = category_names
         if category_names:
             self.category_combo.set(category_names[0])
 
     def load_products(self):
-        """Load products into table"""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        """Load products into table, fetching from the DB on a worker thread"""
+        if self._products_cache is not None:
+            self._do_search()
+            return
 
-        try:
-            products = self.db_manager.get_products()
-            # refresh raw products map
-            self.products_by_id = {}
+        self._load_request_id += 1
+        request_id = self._load_request_id
+        self._products_loading = True
+        future = self._db_pool.submit(self.db_manager.get_products)
+        # Runs on the worker, so it only queues; Tk calls stay on the main thread
+        future.add_done_callback(lambda f: self._fetched.put((request_id, f)))
+        if not self._fetch_poll_scheduled:
+            self._fetch_poll_scheduled = True
+            self.frame.after(50, self._poll_fetched_products)
+
+    def _poll_fetched_products(self):
+        """Apply finished product fetches (Tk thread, while a load is in flight)"""
+        self._fetch_poll_scheduled = False
+        if not self.frame.winfo_exists():
+            return  # Frame was destroyed while the fetch was running
+
+        while True:
+            try:
+                request_id, future = self._fetched.get_nowait()
+            except queue.Empty:
+                break
+            self._apply_products(request_id, future)
 
-            for product in products:
-                # Format COGS
-                cogs_formatted = f"PKR {product[5]:.2f}" if product[5] else "PKR 0.00"
-                # store raw tuple for later use when editing
-                self.products_by_id[product[0]] = product
-
-                self.tree.insert("", tk.END, values=(
-                    product[0],  # ID
-                    product[1],  # Name
-                    product[2] or "",  # SKU
-                    product[3] or "",  # QR Code
-                    product[4],  # Category
-                    cogs_formatted,  # COGS
-                    product[6]   # Stock
-                ))
+        if self._products_loading:
+            self._fetch_poll_scheduled = True
+            self.frame.after(50, self._poll_fetched_products)
 
+    def _apply_products(self, request_id, future):
+        """Install fetched products and refresh the table"""
+        if request_id != self._load_request_id:
+            return  # A newer load is in flight; this result is stale
+        self._products_loading = False
+
+        try:
+            self._set_products_cache(future.result())
         except Exception as e:
+            self._filtered = []
+            self._first_row = 0
+            self._render_window()
             messagebox.showerror("Error", f"Failed to load products: {e}")
+            return
+
+        self._do_search()
+
+    def _set_products_cache(self, rows):
+        """Cache a fresh product list along with its table rows and search text"""
+        products = [Product(*row) for row in rows]
+        # store raw tuples for later use when editing
+        self.products_by_id = {product.id: product for product in products}
+        # Format every row once here instead of on each render
+        self._view_rows = [self._format_product_row(product) for product in products]
+        # Name, SKU, QR code and category joined by a unit separator and
+        # lowercased once, so a search is a single substring test per row
+        self._haystacks = [
+            f"{p.name}\x1f{p.sku or ''}\x1f{p.barcode or ''}\x1f{p.category}".lower()
+            for p in products
+        ]
+        self._sort_keys = {}
+        self._products_cache = products
+
+    @staticmethod
+    def _format_product_row(product):
+        """Build the Treeview values for a Product"""
+        # Format COGS
+        cogs_formatted = f"PKR {product.cogs:.2f}" if product.cogs else "PKR 0.00"
+        return (
+            product.id,
+            product.name,
+            product.sku or "",
+            product.barcode or "",  # QR Code
+            product.category,
+            cogs_formatted,
+            product.stock
+        )
+
+    def _render_window(self):
+        """Insert only the rows of the visible window into the Treeview"""
+        total = len(self._filtered)
+        visible = self._visible_rows
+        self._first_row = max(0, min(self._first_row, total - visible))
+        first = self._first_row
+        last = min(total, first + visible + TREE_WINDOW_PADDING)
+
+        # Rows are pre-formatted, so this is a straight run of Tk calls
+        rows = self._filtered[first:last]
+        self.tree.delete(*self.tree.get_children())
+        insert = self.tree.insert
+        for values in rows:
+            insert("", tk.END, iid=values[0], values=values)
+
+        # Keep the selected product highlighted while it is inside the window;
+        # once it scrolls out, remember that so the selection isn't dropped
+        self._selection_offscreen = False
+        if self.selected_product:
+            iid = str(self.selected_product[0])
+            if self.tree.exists(iid):
+                self.tree.selection_set(iid)
+            else:
+                self._selection_offscreen = True
+
+        if total:
+            self.v_scrollbar.set(first / total, min(1.0, (first + visible) / total))
+        else:
+            self.v_scrollbar.set(0.0, 1.0)
+
+    def _scroll_to(self, first_row):
+        """Move the virtual window, re-rendering only if its first row changes"""
+        first_row = max(0, min(first_row, len(self._filtered) - self._visible_rows))
+        if first_row != self._first_row:
+            self._first_row = first_row
+            self._render_window()
+
+    def _on_tree_scroll(self, action, amount, unit=None):
+        """Scrollbar command: move the virtual window"""
+        if action == "moveto":
+            # Dragging emits many moveto events that land on the same row
+            self._scroll_to(int(float(amount) * len(self._filtered)))
+        elif action == "scroll":
+            step = self._visible_rows if unit == "pages" else 1
+            self._scroll_to(self._first_row + int(amount) * step)
+
+    def _on_tree_wheel(self, event):
+        """Scroll the virtual window with the mouse wheel"""
+        if event.num == 4 or (event.num != 5 and event.delta > 0):
+            self._scroll_to(self._first_row - 3)
+        else:
+            self._scroll_to(self._first_row + 3)
+        return "break"
+
+    def _on_tree_configure(self, event):
+        """Resize the virtual window to the Treeview's height"""
+        rows = max(1, (event.height - TREE_HEADING_HEIGHT) // self._row_height)
+        if rows != self._visible_rows:
+            self._visible_rows = rows
+            self._render_window()
 
     def validate_product_data(self):
         """Validate product form data"""
@@ -434,13 +610,8 @@ class ProductManagementFrame:
             return
 
         # Get category ID
-        category_id = None
-        category_name = ""
-        for cat in self.categories:
-            if cat[1] == data['category']:
-                category_id = cat[0]
-                category_name = cat[1]
-                break
+        category_id = self.category_ids.get(data['category'])
+        category_name = data['category'] if category_id else ""
 
         if not category_id:
             messagebox.showerror("Error", "Invalid category selected")
@@ -478,6 +649,7 @@ class ProductManagementFrame:
                     f"QR Code: {qr_code}\n"
                     f"Category: {category_name}")
                 self.clear_form()
+                self._products_cache = None
                 self.load_products()
             else:
                 messagebox.showerror("Error", "Failed to add product. SKU/QR Code may already exist.")
@@ -485,19 +657,55 @@ class ProductManagementFrame:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to add product: {e}")
     
+    def add_products_bulk(self, rows):
+        """Add several products at once and refresh the table a single time
+
+        rows: dicts shaped like validate_product_data() output. Missing SKU/QR
+        codes are auto-generated; rows with an unknown category, or whose
+        SKU/QR code already exists, are skipped and listed in one warning.
+        Returns the number of products added.
+        """
+        if not self.category_ids:
+            self.load_categories()
+
+        db_rows = []
+        skipped = []
+        for data in rows:
+            category_name = data['category']
+            category_id = self.category_ids.get(category_name)
+            if not category_id:
+                skipped.append(f"{data['name']} (invalid category '{category_name}')")
+                continue
+
+            sku = data.get('sku') or self.generate_sku(data['name'], category_name)
+            qr_code = data.get('qr_code') or self.generate_qr_code(data['name'], category_name)
+            db_rows.append((data['name'], sku, qr_code, category_id, data['cogs'], data['stock']))
+
+        added = self.db_manager.add_products_bulk(db_rows) if db_rows else 0
+        if added < len(db_rows):
+            skipped.append(f"{len(db_rows) - added} product(s) whose SKU/QR Code already exists")
+
+        if added:
+            self._products_cache = None
+            self.load_products()
+
+        if skipped:
+            messagebox.showwarning("Bulk Add",
+                f"Added {added} of {len(rows)} products.\n\nSkipped:\n" + "\n".join(skipped[:20]))
+        return added
+
     def generate_sku(self, product_name, category_name):
         """Generate unique SKU for product"""
+        now = datetime.now()
         try:
-            from datetime import datetime
-            
             # Clean product name (take first 8 alphanumeric chars)
-            name_part = ''.join(filter(str.isalnum, product_name))[:8].upper()
+            name_part = _NON_ALNUM_RE.sub('', product_name)[:8].upper()
             
             # Clean category name (take first 3 alphanumeric chars)
-            category_part = ''.join(filter(str.isalnum, category_name))[:3].upper()
+            category_part = _NON_ALNUM_RE.sub('', category_name)[:3].upper()
             
             # Add timestamp for uniqueness
-            timestamp = datetime.now().strftime("%m%d")
+            timestamp = now.strftime("%m%d")
             
             # Generate SKU: CATEGORY-NAME-TIMESTAMP
             if category_part:
@@ -510,8 +718,7 @@ class ProductManagementFrame:
         except Exception as e:
             print(f"Error generating SKU: {e}")
             # Fallback to simple timestamp-based generation
-            from datetime import datetime
-            timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+            timestamp = now.strftime("%Y%m%d%H%M%S")
             return f"PROD-{timestamp}"
     
     def generate_qr_code(self, product_name, category_name):
@@ -527,7 +734,6 @@ class ProductManagementFrame:
         except Exception as e:
             print(f"Error generating QR code: {e}")
             # Fallback to timestamp-based generation
-            from datetime import datetime
             timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
             return f"MONA-{timestamp}"
 
@@ -541,11 +747,7 @@ class ProductManagementFrame:
             return
 
         # Get category ID
-        category_id = None
-        for cat in self.categories:
-            if cat[1] == data['category']:
-                category_id = cat[0]
-                break
+        category_id = self.category_ids.get(data['category'])
 
         if not category_id:
             messagebox.showerror("Error", "Invalid category selected")
@@ -596,6 +798,7 @@ class ProductManagementFrame:
             if success and initial_update_success and stock_delta_applied:
                 messagebox.showinfo("Success", "Product updated successfully!")
                 self.clear_form()
+                self._products_cache = None
                 self.load_products()
             elif success:
                 # Build a precise partial message
@@ -607,6 +810,7 @@ class ProductManagementFrame:
                 msg = "Product updated, but " + ", and ".join(partials) + "."
                 messagebox.showwarning("Partial Success", msg)
                 self.clear_form()
+                self._products_cache = None
                 self.load_products()
             else:
                 messagebox.showerror("Error", "Failed to update product. SKU/QR Code may already exist.")
@@ -621,7 +825,7 @@ class ProductManagementFrame:
 
         # Ask for admin password
         password = simpledialog.askstring("Admin Password", "Enter admin password to delete:", show='*')
-        if password != "admin123":  # Default password
+        if not Validators.check_admin_password(password):
             messagebox.showerror("Error", "Invalid admin password")
             return
 
@@ -632,6 +836,7 @@ class ProductManagementFrame:
                 if success:
                     messagebox.showinfo("Success", "Product deleted successfully!")
                     self.clear_form()
+                    self._products_cache = None
                     self.load_products()
                 else:
                     messagebox.showerror("Error", "Cannot delete product with existing sales records.")
@@ -738,6 +943,9 @@ class ProductManagementFrame:
                 text=f"✅ Selected: {self.selected_product[1]} - Click Edit or Delete buttons above",
                 fg="#28a745"
             )
+        elif self._selection_offscreen:
+            # Selected row was only scrolled out of the rendered window
+            return
         else:
             self.selected_product = None
             self.edit_btn.config(state=tk.DISABLED, bg="#17a2b8")
@@ -808,38 +1016,39 @@ class ProductManagementFrame:
             return None
 
     def on_search(self, event):
-        """Handle search functionality"""
+        """Handle search key presses, running the search once typing pauses"""
+        if self._search_after_id:
+            self.frame.after_cancel(self._search_after_id)
+        self._search_after_id = self.frame.after(SEARCH_DEBOUNCE_MS, self._do_search)
+
+    def _do_search(self):
+        """Filter the product table by the search term"""
+        self._search_after_id = None
         search_term = self.search_var.get().lower()
 
-        # Clear current items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        if self._products_cache is None:
+            # The search is re-applied once the fetch lands
+            if not self._products_loading:
+                self.load_products()
+            return
 
         try:
-            products = self.db_manager.get_products()
-            # refresh raw products map
-            self.products_by_id = {}
-
-            for product in products:
-                # Check if search term matches any field
-                if (search_term in str(product[1]).lower() or  # Name
-                    search_term in str(product[2] or "").lower() or  # SKU
-                    search_term in str(product[3] or "").lower() or  # QR Code
-                    search_term in str(product[4]).lower()):  # Category
-
-                    # Format COGS
-                    cogs_formatted = f"PKR {product[5]:.2f}" if product[5] else "PKR 0.00"
-                    # store raw tuple for later use when editing
-                    self.products_by_id[product[0]] = product
-
-                    self.tree.insert("", tk.END, values=(
-                        product[0], product[1], product[2] or "", product[3] or "",
-                        product[4], cogs_formatted, product[6]
-                    ))
+            # Filter the cached product list; no DB round-trip per keystroke
+            if search_term:
+                self._filtered = [
+                    row for row, haystack in zip(self._view_rows, self._haystacks)
+                    if search_term in haystack
+                ]
+            else:
+                self._filtered = list(self._view_rows)
+            self._apply_sort()
 
         except Exception as e:
             print(f"Search error: {e}")
 
+        self._first_row = 0
+        self._render_window()
+
     def reset_database(self):
         """Reset database and start fresh"""
         if messagebox.askyesno("Reset Database",
@@ -850,13 +1059,18 @@ class ProductManagementFrame:
                 # Ask for admin password
                 password = simpledialog.askstring("Admin Password",
                                                 "Enter admin password to reset database:", show='*')
-                if password != "admin123":
+                if not Validators.check_admin_password(password):
                     messagebox.showerror("Error", "Invalid admin password")
                     return
 
-                # Reset database file
-                if os.path.exists("inventory.db"):
-                    os.remove("inventory.db")
+                # Release the shared connection so the file can be removed
+                self.db_manager.close()
+
+                # Reset database file (and its WAL side files)
+                db_path = str(self.db_manager.db_path)
+                for db_file in (db_path, db_path + "-wal", db_path + "-shm"):
+                    if os.path.exists(db_file):
+                        os.remove(db_file)
 
                 # Reinitialize database schema
                 if self.db_manager.initialize_database():
@@ -870,6 +1084,7 @@ class ProductManagementFrame:
                         self.main_window.recreate_frames()
                     except Exception:
                         # Fallback: reload product list in current frame
+                        self._products_cache = None
                         self.load_products()
                 else:
                     messagebox.showerror("Error", "Failed to reset database")
@@ -887,19 +1102,13 @@ class ProductManagementFrame:
 
             updated_count = 0
             for product in products:
-                product_id, name, sku, qr_code, category_id, cogs, current_stock = product[:7]
+                # get_products() already joins in the category name
+                product_id, name, sku, qr_code, category_name, cogs, current_stock = product[:7]
 
                 # Skip if QR code already exists
                 if qr_code and qr_code.strip():
                     continue
 
-                # Get category name
-                category_name = ""
-                for cat in self.categories:
-                    if cat[0] == category_id:
-                        category_name = cat[1]
-                        break
-
                 # Generate new QR code
                 new_sku, new_qr_code = qr_generator.generate_sku_qr_code(name, category_name)
 
@@ -914,6 +1123,7 @@ class ProductManagementFrame:
                     f"✅ Generated QR codes for {updated_count} products!\n\n"
                     "All products now have QR codes that can be scanned.\n\n"
                     "📷 Check the 'QR Scanner' tab to see the generated QR codes!")
+                self._products_cache = None
                 self.load_products()  # Refresh the table
             else:
                 messagebox.showinfo("Info", "All products already have QR codes!")
@@ -924,14 +1134,47 @@ class ProductManagementFrame:
             messagebox.showerror("Error", f"Failed to generate QR codes: {e}")
 
     def sort_column(self, col):
-        """Sort table by column"""
-        # This is a basic implementation - could be enhanced
-        pass
+        """Sort table by column, toggling direction on repeated clicks"""
+        if self._sort_state['col'] == col:
+            self._sort_state['desc'] = not self._sort_state['desc']
+        else:
+            self._sort_state = {'col': col, 'desc': False}
+
+        self._apply_sort()
+        self._first_row = 0
+        self._render_window()
+
+    def _apply_sort(self):
+        """Order the filtered rows by the current sort column"""
+        col = self._sort_state['col']
+        if col is None:
+            return  # Keep the DB order (by name)
+
+        # Sort on raw tuple values, not the formatted cells ("PKR 12.00")
+        keys = self._sort_keys.get(col)
+        if keys is None:
+            field = SORT_COLUMNS[col]
+            if col in NUMERIC_SORT_COLUMNS:
+                keys = {p.id: getattr(p, field) or 0 for p in self._products_cache}
+            else:
+                keys = {p.id: str(getattr(p, field) or "").lower() for p in self._products_cache}
+            self._sort_keys[col] = keys
+
+        self._filtered.sort(key=lambda row: keys[row[0]], reverse=self._sort_state['desc'])
 
     def show(self):
         """Show the product management frame"""
         self.frame.pack(fill=tk.BOTH, expand=True)
+
+        # Reload only if something (sales and stock changes in other tabs
+        # included) wrote to the database since the last time
+        token = self.db_manager.change_token()
+        if token is not None and token == self._seen_change_token:
+            return
+        self._seen_change_token = token
+
         self.load_categories()
+        self._products_cache = None
         self.load_products()
         self.clear_form()
 
@@ -7,8 +7,16 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog
 import threading
 import time
+import glob
+import queue
+import traceback
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image, ImageTk
 import os
+import shutil
 import sys
 
 # Graceful import handling for production
@@ -26,40 +34,114 @@ except ImportError:
     NUMPY_AVAILABLE = False
     print("⚠️ NumPy not available - alternative scanning limited")
 
-# Don't import qrcode at startup - import only when needed
-QRCODE_AVAILABLE = False
+try:
+    from utils.qr_generator import QRGenerator, thumbnail_path
+except ImportError:
+    QRGenerator = None
+    thumbnail_path = None
 
+# Don't import qrcode at startup - only check it is installed; functions import it when needed
 try:
-    import qrcode
-    QRCODE_AVAILABLE = True
-    print("✅ qrcode library loaded successfully")
-except ImportError as e:
+    import importlib.util
+    QRCODE_AVAILABLE = importlib.util.find_spec("qrcode") is not None
+except Exception:
     QRCODE_AVAILABLE = False
-    print(f"⚠️ qrcode library not available - QR code generation disabled: {e}")
-    # Try to install qrcode library
-    try:
-        import subprocess
-        import sys
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "qrcode[pil]"])
-        print("✅ qrcode library installed, please restart the application")
-    except:
-        print("❌ Could not install qrcode library automatically")
-except Exception as e:
-    QRCODE_AVAILABLE = False
-    print(f"⚠️ qrcode library error - QR code generation disabled: {e}")
+if not QRCODE_AVAILABLE:
+    print("⚠️ qrcode library not available - QR code generation disabled (pip install qrcode[pil])")
+
+# Scan log history kept in the results Text widget
+MAX_SCAN_LOG_LINES = 500
+
+# Scan log levels: ASCII marker and text colour. Messages are written without
+# emoji so the results widget stays out of Tk's font-fallback rendering path
+SCAN_LOG_LEVELS = {
+    "ok": ("[OK] ", "#2a8a5a"),
+    "error": ("[ERR] ", "#c62828"),
+    "warn": ("[WARN] ", "#e65100"),
+    "info": ("", None),
+}
+# Leading emoji that imply a level when add_scan_result isn't given one
+SCAN_LOG_EMOJI_LEVELS = {"✅": "ok", "❌": "error", "⚠️": "warn"}
+
+# Native capture backend per platform; others use OpenCV's default choice
+CAMERA_BACKENDS = {"win32": "CAP_DSHOW", "darwin": "CAP_AVFOUNDATION", "linux": "CAP_V4L2"}
+
+# Camera frames are grabbed at the camera's rate but only decoded this often
+PREVIEW_INTERVAL = 1 / 15
+IDLE_PREVIEW_INTERVAL = 0.25  # After 10s without a scan
+SCAN_INTERVAL = 0.2  # Pause between QR decodes of the latest frame
+SCAN_SCALE = 0.5  # Decoders see a half-size frame; plenty for codes held up to the camera
+
+# Display-sized QR PhotoImages kept for repeat scans of the same products
+QR_DISPLAY_CACHE_SIZE = 32
+
+# Product lookups are reused for this long, keyed by scanned code
+PRODUCT_CACHE_TTL = 2.0
+PRODUCT_CACHE_SIZE = 256
+
+# Codes cycled through by the "Test with sample" button
+SAMPLE_QR_CODES = ("123456789", "987654321", "SAMPLE001", "TEST123", "QR-DEMO-001")
+
+
+@dataclass
+class ScannedProduct:
+    """Product row from get_product_by_barcode; stock is updated in place after each operation"""
+    __slots__ = ("id", "name", "sku", "qr_code", "category_id", "cogs", "stock")
+    id: int
+    name: str
+    sku: str
+    qr_code: str
+    category_id: int
+    cogs: float
+    stock: int
 
 class QRScannerFrame(ttk.Frame):
+    _pyzbar_available = None  # Result of the find_spec probe, shared by all instances
+
     def __init__(self, parent, db_manager):
         super().__init__(parent)
         self.parent = parent
         self.db_manager = db_manager
         self.camera = None
         self.is_camera_on = False
+        self.capture_thread = None
         self.scan_thread = None
+        self._stop_evt = threading.Event()  # Signals the capture and scan threads to exit
+        self._scan_queue = queue.Queue()  # Codes decoded by the scan thread, handled on the Tk thread
+        self._dispatching_scan = False
         self.current_product = None
         self.operation_mode = "stock_out"  # Default to stock-out for inventory management
         self.action_frame = None  # Track the action buttons frame to prevent duplication
 
+        # Latest camera frame handed from the capture thread to the Tk and scan threads
+        self._frame_lock = threading.Lock()
+        self._disp_rgb = None  # Preallocated 400x300 RGB preview buffer
+        self._frame_ready = False
+        self._preview_visible = True  # Set by _refresh_preview; False while the tab is hidden
+        # Single slot; replaced by each new frame so slow decodes skip frames, and
+        # the scan thread blocks on it instead of polling
+        self._frame_q = queue.Queue(maxsize=1)
+        self._preview_img = None  # Reused PhotoImage for the camera preview
+        self._qr_photo_cache = OrderedDict()  # {(path, mtime): PhotoImage}, see display_qr_image
+        self._qr_image_paths = {}  # {qr_data: generated image path}, saves a glob per scan
+        self._qr_generator = None  # Shared QRGenerator, so its rendered-image cache persists
+        self._category_cache = None  # {category_id: name}, built on first lookup
+        self._category_ids = None  # {name: category_id}, rebuilt with the cache above
+        self._product_cache = OrderedDict()  # {code: (timestamp, row)}, see _cached_product_lookup
+        self._last_code = None  # Last accepted camera scan, for debouncing repeats
+        self._last_code_ts = 0.0
+        self._log_queue = deque()  # Pending scan log lines, flushed in one insert
+        self._log_flush_scheduled = False
+        self._sample_index = 0  # Next sample used by test_with_sample
+        self._barcode_scanner = None  # Created on first image upload
+        self._cv_qr = cv2.QRCodeDetector() if CV2_AVAILABLE else None  # Fallback camera decoder
+        self._io_pool = ThreadPoolExecutor(max_workers=2)  # Image decoding, QR generation, file I/O
+        self._io_done = queue.Queue()  # (on_done, future) pairs, drained on the Tk thread
+        self._io_pending = 0  # Jobs submitted but not yet handed back to on_done
+        self._sale_dialog = None  # Quick sale / new product dialogs, built on first use
+        self._sale_product = None  # Product the open sale dialog was shown for
+        self._product_dialog = None
+
         self.create_widgets()
 
     def create_operation_mode_controls(self):
@@ -179,6 +261,9 @@ class QRScannerFrame(ttk.Frame):
 
         self.results_text = tk.Text(results_frame, height=6, width=80, font=("Consolas", 9))
         self.results_text.pack(fill="x")
+        for level, (marker, color) in SCAN_LOG_LEVELS.items():
+            if color:
+                self.results_text.tag_configure(level, foreground=color)
         
         # Action buttons frame
         action_frame = ttk.Frame(results_frame)
@@ -232,12 +317,14 @@ class QRScannerFrame(ttk.Frame):
 
     def _check_pyzbar_available(self) -> bool:
         """Check if pyzbar is available for QR code scanning"""
-        try:
-            import importlib.util
-            spec = importlib.util.find_spec("pyzbar")
-            return spec is not None
-        except:
-            return False
+        # find_spec walks sys.path, so probe once per process
+        if QRScannerFrame._pyzbar_available is None:
+            try:
+                import importlib.util
+                QRScannerFrame._pyzbar_available = importlib.util.find_spec("pyzbar") is not None
+            except:
+                QRScannerFrame._pyzbar_available = False
+        return QRScannerFrame._pyzbar_available
         
     def create_camera_controls(self):
         controls_frame = ttk.Frame(self.camera_frame)
@@ -358,7 +445,7 @@ class QRScannerFrame(ttk.Frame):
             return
 
         try:
-            self.camera = cv2.VideoCapture(0)
+            self.camera = self._open_camera(0)
             if not self.camera.isOpened():
                 messagebox.showerror("Camera Error",
                                    "❌ Cannot access camera.\n\n"
@@ -368,7 +455,16 @@ class QRScannerFrame(ttk.Frame):
                                    "• Camera permissions are enabled")
                 return
 
+            # Keep only the newest frame queued and prefer cheap-to-decode MJPEG
+            if not self.camera.set(cv2.CAP_PROP_BUFFERSIZE, 1):
+                self.add_scan_result("⚠️ Camera driver ignored buffer size; preview may lag")
+            self.camera.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+            # 640x480 is plenty for QR decoding and the 400x300 preview
+            self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+            self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+
             self.is_camera_on = True
+            self._stop_evt.clear()
             self.start_btn.config(state="disabled")
             self.stop_btn.config(state="normal")
 
@@ -376,10 +472,15 @@ class QRScannerFrame(ttk.Frame):
             self.camera_status_label.config(text="📷 Camera: ACTIVE", foreground="green")
             self.display_status_label.config(text="📹 Camera Live Feed", foreground="green")
 
-            # Start scanning thread
+            # Capture and decode on separate threads so a slow decode never stalls the camera
+            self._drain_frame_queue()
+            self.capture_thread = threading.Thread(target=self._capture_loop)
+            self.capture_thread.daemon = True
+            self.capture_thread.start()
             self.scan_thread = threading.Thread(target=self.scan_qr_codes)
             self.scan_thread.daemon = True
             self.scan_thread.start()
+            self.after(33, self._refresh_preview)
 
             messagebox.showinfo("Camera Started",
                               "✅ Camera is now active!\n\n"
@@ -390,11 +491,34 @@ class QRScannerFrame(ttk.Frame):
         except Exception as e:
             messagebox.showerror("Camera Error", f"Failed to start camera: {str(e)}")
     
+    @staticmethod
+    def _open_camera(index):
+        """Open a camera with the platform's native backend, falling back to the default"""
+        backend = getattr(cv2, CAMERA_BACKENDS.get(sys.platform, ""), None)
+        if backend is not None:
+            camera = cv2.VideoCapture(index, backend)
+            if camera.isOpened():
+                return camera
+            camera.release()
+        return cv2.VideoCapture(index)
+
     def stop_camera(self):
         self.is_camera_on = False
+        self._stop_evt.set()
+
+        # Let the threads finish their current frame before releasing the camera
+        for thread in (self.capture_thread, self.scan_thread):
+            if thread and thread.is_alive() and thread is not threading.current_thread():
+                thread.join(timeout=1.0)
+        self.capture_thread = None
+        self.scan_thread = None
+
         if self.camera:
             self.camera.release()
             self.camera = None
+
+        # Handle anything decoded after the last preview refresh
+        self.after(0, self._dispatch_scans)
         
         self.start_btn.config(state="normal")
         self.stop_btn.config(state="disabled")
@@ -411,75 +535,225 @@ class QRScannerFrame(ttk.Frame):
             scanner = ProfessionalQRScanner()
             status = scanner.get_status()
 
-            self.add_scan_result("🚀 Professional QR scanner initialized")
-            self.add_scan_result(f"📊 Methods available: {[m for m in status['methods'] if m]}")
-            self.add_scan_result("🎯 READY TO SCAN - Point camera at QR code!")
+            self.add_scan_results([
+                "🚀 Professional QR scanner initialized",
+                f"📊 Methods available: {[m for m in status['methods'] if m]}",
+                "🎯 READY TO SCAN - Point camera at QR code!",
+            ])
 
         except Exception as e:
             self.add_scan_result(f"❌ QR scanner initialization failed: {e}")
             scanner = None
 
+        # Resolve the fallback decoders once instead of creating/importing them per frame
+        pyzbar_decode = None
+        if scanner is None:
+            try:
+                from pyzbar.pyzbar import decode, ZBarSymbol
+                # Only enable the QR symbology; ZBar skips EAN/Code128/... entirely
+                pyzbar_decode = lambda image: decode(image, symbols=[ZBarSymbol.QRCODE])
+            except Exception as e:
+                self.add_scan_result(f"⚠️ pyzbar fallback not available: {str(e)[:50]}")
+
+        cvt_color = cv2.cvtColor
+        resize = cv2.resize
         scan_count = 0
 
-        while self.is_camera_on:
+        # Run the gray/resize step through OpenCV's T-API when an OpenCL device
+        # exists (iGPU on most laptops). The flag is per-thread, so set it here
+        use_opencl = False
+        try:
+            if cv2.ocl.haveOpenCL():
+                cv2.ocl.setUseOpenCL(True)
+                use_opencl = cv2.ocl.useOpenCL()
+        except Exception:
+            use_opencl = False
+
+        while not self._stop_evt.is_set():
+            # Wait for the newest frame published by _capture_loop
+            try:
+                frame = self._frame_q.get(timeout=0.2)
+            except queue.Empty:
+                continue
+
+            # Grayscale once, then shrink: decode cost scales with pixel count
+            if use_opencl:
+                # Decoders need host memory, so only the small gray frame is downloaded
+                gray = resize(cvt_color(cv2.UMat(frame), cv2.COLOR_BGR2GRAY), None,
+                              fx=SCAN_SCALE, fy=SCAN_SCALE, interpolation=cv2.INTER_AREA).get()
+            else:
+                gray = resize(cvt_color(frame, cv2.COLOR_BGR2GRAY), None,
+                              fx=SCAN_SCALE, fy=SCAN_SCALE, interpolation=cv2.INTER_AREA)
+
+            # Professional QR scanning
+            if scanner:
+                try:
+                    qr_data = scanner.scan_frame(gray)
+
+                    # _is_repeat_scan suppresses double-submits, so there is no
+                    # post-detection pause and a newly presented code scans at once
+                    if qr_data and not self._is_repeat_scan(qr_data):
+                        # Looked up on the Tk thread by _dispatch_scans
+                        self._scan_queue.put((qr_data, f"🎯 QR CODE DETECTED: {qr_data}",
+                                              "✅ QR scanning successful!"))
+
+                except Exception as e:
+                    if scan_count % 50 == 0:  # Log errors occasionally
+                        self.add_scan_result(f"⚠️ QR scan error: {str(e)[:50]}")
+
+            # Fallback scanning methods
+            else:
+                # Decode directly as fallback for QR codes
+                try:
+                    # OpenCV's C++ detector first, pyzbar only if it finds nothing
+                    qr_codes = self._detect_qr_codes(gray)
+                    if not qr_codes and pyzbar_decode:
+                        qr_codes = [obj.data.decode('utf-8') for obj in pyzbar_decode(gray)]
+
+                    for qr_data in qr_codes:
+                        if self._is_repeat_scan(qr_data):
+                            continue
+
+                        self._scan_queue.put((qr_data, f"📷 Fallback QR scan - Data: {qr_data}", None))
+
+                except Exception as e:
+                    if scan_count % 100 == 0:
+                        self.add_scan_result("🔍 Scanning for QR codes...")
+
+            scan_count += 1
+            self._stop_evt.wait(SCAN_INTERVAL)
+
+    def _detect_qr_codes(self, gray):
+        """Decode every QR code in a grayscale frame with OpenCV's detector"""
+        if self._cv_qr is None:
+            return []
+        if hasattr(self._cv_qr, "detectAndDecodeMulti"):  # OpenCV 4.3+
+            retval, decoded_info, _, _ = self._cv_qr.detectAndDecodeMulti(gray)
+            return [data for data in decoded_info if data] if retval else []
+        data, _, _ = self._cv_qr.detectAndDecode(gray)
+        return [data] if data else []
+
+    def _capture_loop(self):
+        """Read camera frames and publish them for the preview and the scan thread"""
+        # Local aliases keep attribute lookups out of the per-frame path
+        cvt_color = cv2.cvtColor
+        resize = cv2.resize
+
+        # Preview buffers are reused for every frame instead of reallocated
+        disp_bgr = np.empty((300, 400, 3), np.uint8)
+        self._disp_rgb = np.empty((300, 400, 3), np.uint8)
+
+        failed_reads = 0
+        started = time.monotonic()
+        next_retrieve = started
+
+        while not self._stop_evt.is_set():
             if self.camera and self.camera.isOpened():
-                ret, frame = self.camera.read()
+                # grab() only dequeues the frame; the expensive decode happens in
+                # retrieve(), which runs just for frames we show or scan
+                ret = self.camera.grab()
                 if ret:
-                    # Convert frame for display
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    frame_pil = Image.fromarray(frame_rgb)
-                    frame_pil = frame_pil.resize((400, 300), Image.Resampling.LANCZOS)
-                    frame_tk = ImageTk.PhotoImage(frame_pil)
+                    now = time.monotonic()
+                    if now < next_retrieve:
+                        continue
+                    idle = now - max(started, self._last_code_ts) > 10
+                    next_retrieve = now + (IDLE_PREVIEW_INTERVAL if idle else PREVIEW_INTERVAL)
+                    ret, frame = self.camera.retrieve()
+
+                if not ret:
+                    failed_reads = min(failed_reads + 1, 8)
+                else:
+                    failed_reads = 0
+                    show_preview = self._preview_visible
+
+                    # Convert frame for display (skipped while the tab is hidden;
+                    # scanning carries on for always-on stations)
+                    if show_preview:
+                        resize(frame, (400, 300), dst=disp_bgr, interpolation=cv2.INTER_AREA)
+
+                    # Publish the preview for _refresh_preview; Tk widgets are
+                    # only touched on the main thread
+                    with self._frame_lock:
+                        if show_preview:
+                            cvt_color(disp_bgr, cv2.COLOR_BGR2RGB, dst=self._disp_rgb)
+                            self._frame_ready = True
+
+                    # Latest-only: drop a frame the scan thread hasn't taken yet
+                    self._drain_frame_queue()
+                    try:
+                        self._frame_q.put_nowait(frame)
+                    except queue.Full:
+                        pass  # Only this thread puts, so a drained slot stays free
+
+                    continue  # Next grab; only failures fall through to the back-off
+
+            # Back off on camera read failures (or while the camera is closed)
+            self._stop_evt.wait(min(0.03 * (1 << failed_reads), 0.25))
+
+    def _drain_frame_queue(self):
+        """Discard a frame still waiting for the scan thread"""
+        try:
+            self._frame_q.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _is_repeat_scan(self, qr_data):
+        """Check whether the same code was already accepted in the last 2 seconds"""
+        now = time.monotonic()
+        if qr_data == self._last_code and now - self._last_code_ts < 2.0:
+            return True
 
-                    self.camera_label.config(image=frame_tk)
-                    self.camera_label.image = frame_tk
+        self._last_code = qr_data
+        self._last_code_ts = now
+        return False
 
-                    # Professional QR scanning
-                    if scanner:
-                        try:
-                            # Scan every 5 frames for better responsiveness
-                            if scan_count % 5 == 0:
-                                qr_data = scanner.scan_frame(frame)
+    def _refresh_preview(self):
+        """Show the latest camera frame (runs on the Tk main thread)"""
+        self._dispatch_scans()
+        if not self.is_camera_on:
+            return
+
+        # Nothing to draw while another notebook tab is showing
+        self._preview_visible = bool(self.camera_label.winfo_viewable())
+
+        # PhotoImage creation and paste() both copy, so the buffer is only held briefly
+        with self._frame_lock:
+            if self._frame_ready and self._preview_visible:
+                self._frame_ready = False
+                frame_pil = Image.frombuffer('RGB', (400, 300), self._disp_rgb, 'raw', 'RGB', 0, 1)
+                if self._preview_img is None:
+                    self._preview_img = ImageTk.PhotoImage(frame_pil)
+                    self.camera_label.config(image=self._preview_img)
+                else:
+                    # Copy into the existing Tk image instead of allocating a new one
+                    self._preview_img.paste(frame_pil)
 
-                                if qr_data:
-                                    self.add_scan_result(f"🎯 QR CODE DETECTED: {qr_data}")
-                                    self.lookup_product(qr_data, is_camera_scan=True)
+        self.after(33, self._refresh_preview)
 
-                                    # Visual feedback
-                                    self.add_scan_result("✅ QR scanning successful!")
+    def _dispatch_scans(self):
+        """Look up codes queued by the scan thread (runs on the Tk main thread)"""
+        # lookup_product may open a modal dialog, whose event loop calls back in here
+        if self._dispatching_scan:
+            return
 
-                                    # Brief pause after detection
-                                    time.sleep(0.5)
+        self._dispatching_scan = True
+        try:
+            while True:
+                try:
+                    qr_data, found_msg, done_msg = self._scan_queue.get_nowait()
+                except queue.Empty:
+                    break
 
-                            scan_count += 1
+                self.add_scan_result(found_msg)
+                self.lookup_product(qr_data, is_camera_scan=True)
+                if done_msg:
+                    self.add_scan_result(done_msg)
+        finally:
+            self._dispatching_scan = False
 
-                        except Exception as e:
-                            if scan_count % 50 == 0:  # Log errors occasionally
-                                self.add_scan_result(f"⚠️ QR scan error: {str(e)[:50]}")
+        # Pick up log lines queued by the capture/scan threads
+        self._schedule_log_flush()
 
-                    # Fallback scanning methods
-                    else:
-                        # Try pyzbar directly as fallback for QR codes
-                        try:
-                            from pyzbar import pyzbar
-                            if scan_count % 5 == 0:  # Every 5 frames
-                                decoded_objects = pyzbar.decode(frame)
-                                for obj in decoded_objects:
-                                    if obj.type == 'QRCODE':
-                                        qr_data = obj.data.decode('utf-8')
-
-                                        self.add_scan_result(f"📷 Fallback QR scan - Data: {qr_data}")
-                                        self.lookup_product(qr_data, is_camera_scan=True)
-                                        time.sleep(0.5)
-
-                        except Exception as e:
-                            if scan_count % 100 == 0:
-                                self.add_scan_result("🔍 Scanning for QR codes...")
-
-                        scan_count += 1
-
-            time.sleep(0.1)  # Small delay to prevent high CPU usage
-    
     def lookup_manual(self, event=None):
         qr_data = self.manual_entry.get().strip()
         if qr_data:
@@ -490,33 +764,31 @@ class QRScannerFrame(ttk.Frame):
     
     def test_with_sample(self):
         """Test with a sample QR code"""
-        sample_qr_codes = ["123456789", "987654321", "SAMPLE001", "TEST123", "QR-DEMO-001"]
-        sample = sample_qr_codes[int(time.time()) % len(sample_qr_codes)]
+        sample = SAMPLE_QR_CODES[self._sample_index % len(SAMPLE_QR_CODES)]
+        self._sample_index += 1
         self.manual_entry.delete(0, tk.END)
         self.manual_entry.insert(0, sample)
         self.lookup_product(sample)
     
     def lookup_product(self, qr_data, is_camera_scan=False):
         # Search in database
-        product = self.db_manager.get_product_by_barcode(qr_data)
+        product = self._cached_product_lookup(qr_data)
         if product:
             product_id, name, sku, qr_code, category_id, cogs, current_stock = product[:7]
 
             # Get category name
-            category_name = "Unknown"
-            categories = self.db_manager.get_categories()
-            for cat in categories:
-                if cat[0] == category_id:
-                    category_name = cat[1]
-                    break
+            category_name = self._get_category_map().get(category_id, "Unknown")
 
-            self.add_scan_result(f"✅ Found: {name}")
-            self.add_scan_result(f"   SKU: {sku or 'N/A'}")
-            self.add_scan_result(f"   Stock: {current_stock} units")
-            self.add_scan_result(f"   Category: {category_name}")
-            self.add_scan_result(f"   COGS: PKR {cogs:.2f}")
+            self.add_scan_results([
+                f"✅ Found: {name}",
+                f"   SKU: {sku or 'N/A'}",
+                f"   Stock: {current_stock} units",
+                f"   Category: {category_name}",
+                f"   COGS: PKR {cogs:.2f}",
+            ])
 
             # Store current product for operations
+            product = ScannedProduct(*product[:7])
             self.current_product = product
 
             # Generate and display QR code image for this product
@@ -532,12 +804,16 @@ class QRScannerFrame(ttk.Frame):
                     self.show_product_actions(product)
             else:
                 # For manual lookup, only show info and QR code, no stock operations
-                self.add_scan_result(f"📱 QR code generated and displayed for manual lookup")
-                self.add_scan_result(f"💡 To process stock operations, scan this QR code with the camera")
+                self.add_scan_results([
+                    f"📱 QR code generated and displayed for manual lookup",
+                    f"💡 To process stock operations, scan this QR code with the camera",
+                ])
                 self.show_quick_actions()
         else:
-            self.add_scan_result(f"❌ Not found: {qr_data}")
-            self.add_scan_result(f"   Tip: Add this product in Products section")
+            self.add_scan_results([
+                f"❌ Not found: {qr_data}",
+                f"   Tip: Add this product in Products section",
+            ])
 
             # Generate and display QR code for the entered data (even if not in database)
             self.generate_and_display_manual_qr(qr_data)
@@ -545,10 +821,46 @@ class QRScannerFrame(ttk.Frame):
             # Offer to create new product
             self.offer_create_product(qr_data)
 
+    def _cached_product_lookup(self, code):
+        """get_product_by_barcode with a short-lived cache for repeated scans of the same code"""
+        now = time.monotonic()
+        hit = self._product_cache.get(code)
+        if hit is not None and now - hit[0] < PRODUCT_CACHE_TTL:
+            return hit[1]
+
+        product = self.db_manager.get_product_by_barcode(code)
+        self._product_cache.pop(code, None)  # Re-insert at the newest end
+        self._product_cache[code] = (now, product)
+        if len(self._product_cache) > PRODUCT_CACHE_SIZE:
+            self._product_cache.popitem(last=False)
+        return product
+
+    def _forget_cached_products(self):
+        """Drop cached lookups after this frame changes products or stock"""
+        self._product_cache.clear()
+
+    def _get_category_map(self):
+        """Get {category_id: name}, querying the database only when the cache is empty"""
+        if self._category_cache is None:
+            categories = self.db_manager.get_categories()
+            self._category_cache = {cat[0]: cat[1] for cat in categories}
+            self._category_ids = {cat[1]: cat[0] for cat in categories}
+        return self._category_cache
+
+    def _get_category_ids(self):
+        """Get {name: category_id} from the same cache as _get_category_map"""
+        self._get_category_map()
+        return self._category_ids
+
+    def invalidate_category_cache(self):
+        """Drop cached categories so the next lookup re-reads them"""
+        self._category_cache = None
+        self._category_ids = None
+
     def process_stock_operation(self, product):
         """Process stock operation automatically when QR is scanned"""
         try:
-            product_id, name, sku, qr_code, category_id, cogs, current_stock = product[:7]
+            product_id, current_stock = product.id, product.stock
             
             # Get quantity from input
             try:
@@ -561,41 +873,37 @@ class QRScannerFrame(ttk.Frame):
                 quantity = 1
                 self.quantity_var.set("1")
             
-            # Process based on operation mode
+            # Process based on operation mode; the stock check and update are one
+            # UPDATE, so rapid scans can't oversell from a stale product row
             if self.operation_mode == "stock_out":
-                # Check if sufficient stock available
-                if current_stock < quantity:
-                    self.add_scan_result(f"❌ Insufficient stock! Available: {current_stock}, Required: {quantity}")
-                    return
-                
-                # Process stock out
-                success = self.db_manager.update_stock_change(product_id, quantity, "stock_out")
-                if success:
-                    new_stock = current_stock - quantity
-                    self.add_scan_result(f"✅ Stock Out: -{quantity} units")
-                    self.add_scan_result(f"   Previous Stock: {current_stock}")
-                    self.add_scan_result(f"   New Stock: {new_stock}")
+                new_stock = self.db_manager.apply_stock_delta(product_id, -quantity)
+                self._forget_cached_products()
+                if new_stock is not None:
+                    self.add_scan_results([
+                        f"✅ Stock Out: -{quantity} units",
+                        f"   Previous Stock: {current_stock}",
+                        f"   New Stock: {new_stock}",
+                    ])
                     
                     # Update current product data
-                    product_list = list(self.current_product)
-                    product_list[6] = new_stock
-                    self.current_product = tuple(product_list)
+                    self.current_product.stock = new_stock
                 else:
-                    self.add_scan_result("❌ Failed to process stock out")
+                    self.add_scan_result(f"❌ Insufficient stock! Available: {current_stock}, Required: {quantity}")
+                    return
                     
             elif self.operation_mode == "stock_in":
                 # Process stock in
-                success = self.db_manager.update_stock_change(product_id, quantity, "stock_in")
-                if success:
-                    new_stock = current_stock + quantity
-                    self.add_scan_result(f"✅ Stock In: +{quantity} units")
-                    self.add_scan_result(f"   Previous Stock: {current_stock}")
-                    self.add_scan_result(f"   New Stock: {new_stock}")
+                new_stock = self.db_manager.apply_stock_delta(product_id, quantity)
+                self._forget_cached_products()
+                if new_stock is not None:
+                    self.add_scan_results([
+                        f"✅ Stock In: +{quantity} units",
+                        f"   Previous Stock: {current_stock}",
+                        f"   New Stock: {new_stock}",
+                    ])
                     
                     # Update current product data
-                    product_list = list(self.current_product)
-                    product_list[6] = new_stock
-                    self.current_product = tuple(product_list)
+                    self.current_product.stock = new_stock
                 else:
                     self.add_scan_result("❌ Failed to process stock in")
             
@@ -647,7 +955,8 @@ class QRScannerFrame(ttk.Frame):
         dialog.geometry("+%d+%d" % (self.winfo_rootx() + 50, self.winfo_rooty() + 50))
         
         # Product info
-        product_id, name, sku, qr_code, category_id, cogs, current_stock = self.current_product[:7]
+        product = self.current_product
+        product_id, name, sku, current_stock = product.id, product.name, product.sku, product.stock
         
         info_frame = ttk.LabelFrame(dialog, text="Product Information", padding=10)
         info_frame.pack(fill="x", padx=10, pady=5)
@@ -674,6 +983,7 @@ class QRScannerFrame(ttk.Frame):
                 qty = int(stock_in_qty.get())
                 if qty > 0:
                     success = self.db_manager.update_stock_change(product_id, qty, "stock_in")
+                    self._forget_cached_products()
                     if success:
                         self.add_scan_result(f"✅ Manual Stock In: +{qty} units")
                         dialog.destroy()
@@ -701,6 +1011,7 @@ class QRScannerFrame(ttk.Frame):
                 if qty > 0:
                     if current_stock >= qty:
                         success = self.db_manager.update_stock_change(product_id, qty, "stock_out")
+                        self._forget_cached_products()
                         if success:
                             self.add_scan_result(f"✅ Manual Stock Out: -{qty} units")
                             dialog.destroy()
@@ -724,7 +1035,8 @@ class QRScannerFrame(ttk.Frame):
             self.add_scan_result("❌ No product selected")
             return
         
-        product_id, name, sku, qr_code, category_id, cogs, current_stock = self.current_product[:7]
+        product = self.current_product
+        product_id, name, cogs, current_stock = product.id, product.name, product.cogs, product.stock
         
         # Simple sale dialog
         dialog = tk.Toplevel(self)
@@ -782,10 +1094,10 @@ class QRScannerFrame(ttk.Frame):
                     return
                 
                 # Process sale
-                from datetime import datetime
-                success = self.db_manager.add_sale(product_id, quantity, selling_price, datetime.now().isoformat())
+                new_stock = self.db_manager.add_sale(product_id, quantity, selling_price, datetime.now().isoformat())
+                self._forget_cached_products()
                 
-                if success:
+                if new_stock is not None:
                     self.add_scan_result(f"✅ Sale recorded: {quantity} units @ PKR {selling_price:.2f}")
                     dialog.destroy()
                 else:
@@ -823,50 +1135,92 @@ class QRScannerFrame(ttk.Frame):
         )
         
         if file_path:
+            # Decode on the worker pool so large images don't block the UI
+            self.add_scan_result("🔍 Scanning image with professional scanner...")
+            self._run_in_background(self._apply_image_result, self._decode_image_file, file_path)
+
+    def _run_in_background(self, on_done, func, *args):
+        """Run func(*args) on the worker pool and call on_done(future) on the Tk thread"""
+        future = self._io_pool.submit(func, *args)
+        # Done callbacks run on the worker, so they only queue; Tk is polled below
+        future.add_done_callback(lambda f: self._io_done.put((on_done, f)))
+        self._io_pending += 1
+        if self._io_pending == 1:
+            self.after(50, self._poll_background_results)
+
+    def _poll_background_results(self):
+        """Hand finished worker jobs to their callbacks (Tk thread, while jobs are pending)"""
+        while True:
             try:
-                # Load and process image
-                image = cv2.imread(file_path)
-                if image is not None:
-                                                # Try to decode barcode from image using professional scanner
-                            try:
-                                from utils.professional_barcode_scanner import ProfessionalBarcodeScanner
-                                scanner = ProfessionalBarcodeScanner()
-                                
-                                self.add_scan_result("🔍 Scanning image with professional scanner...")
-                                barcode_data = scanner.scan_frame(image)
-                                
-                                if barcode_data:
-                                    self.add_scan_result(f"✅ Image scan successful - Data: {barcode_data}")
-                                    self.lookup_product(barcode_data, is_camera_scan=True)
-                                else:
-                                    self.add_scan_result("🔍 Trying direct pyzbar scan...")
-                                    
-                                    # Try pyzbar directly
-                                    try:
-                                        from pyzbar import pyzbar
-                                        barcodes = pyzbar.decode(image)
-                                        if barcodes:
-                                            for barcode in barcodes:
-                                                barcode_data = barcode.data.decode('utf-8')
-                                                barcode_type = barcode.type
-                                                self.add_scan_result(f"📷 Direct pyzbar scan - Type: {barcode_type}, Data: {barcode_data}")
-                                                self.lookup_product(barcode_data, is_camera_scan=True)
-                                                return
-                                    except Exception as e:
-                                        self.add_scan_result(f"⚠️ pyzbar error: {str(e)[:50]}")
-                                    
-                                    self.add_scan_result("❌ No barcode detected in image")
-                                    self.add_scan_result("💡 Try: Better quality image, clear barcode, good lighting")
-                                            
-                            except Exception as e:
-                                self.add_scan_result(f"❌ Professional scanner error: {str(e)}")
-                                self.add_scan_result("❌ Image scanning failed")
-                else:
-                    self.add_scan_result("❌ Failed to load image")
-                    
+                on_done, future = self._io_done.get_nowait()
+            except queue.Empty:
+                break
+            self._io_pending -= 1
+            try:
+                on_done(future)
+            except Exception as e:
+                self.add_scan_result(f"❌ Background task error: {e}")
+
+        if self._io_pending > 0:
+            self.after(50, self._poll_background_results)
+
+    def _decode_image_file(self, file_path):
+        """Decode a barcode from an image file (runs on the worker pool)
+
+        Returns (barcode_data, log_lines); Tk is not touched here.
+        """
+        # Load and process image (decoders only need luminance)
+        image = cv2.imread(file_path, cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            return None, ["❌ Failed to load image"]
+
+        # Try to decode barcode from image using professional scanner
+        try:
+            scanner = self._get_barcode_scanner()
+            barcode_data = scanner.scan_frame(image)
+
+            if barcode_data:
+                return barcode_data, [f"✅ Image scan successful - Data: {barcode_data}"]
+
+            log_lines = ["🔍 Trying direct pyzbar scan..."]
+
+            # Try pyzbar directly
+            try:
+                from pyzbar import pyzbar
+                for barcode in pyzbar.decode(image):
+                    barcode_data = barcode.data.decode('utf-8')
+                    log_lines.append(f"📷 Direct pyzbar scan - Type: {barcode.type}, Data: {barcode_data}")
+                    return barcode_data, log_lines
             except Exception as e:
-                self.add_scan_result(f"❌ Error processing image: {str(e)}")
+                log_lines.append(f"⚠️ pyzbar error: {str(e)[:50]}")
+
+            log_lines.append("❌ No barcode detected in image")
+            log_lines.append("💡 Try: Better quality image, clear barcode, good lighting")
+            return None, log_lines
+
+        except Exception as e:
+            return None, [f"❌ Professional scanner error: {str(e)}", "❌ Image scanning failed"]
+
+    def _apply_image_result(self, future):
+        """Show an image decode result (runs on the Tk main thread)"""
+        try:
+            barcode_data, log_lines = future.result()
+        except Exception as e:
+            self.add_scan_result(f"❌ Error processing image: {str(e)}")
+            return
+
+        for line in log_lines:
+            self.add_scan_result(line)
+        if barcode_data:
+            self.lookup_product(barcode_data, is_camera_scan=True)
     
+    def _get_barcode_scanner(self):
+        """Get the shared barcode scanner, creating it on first use"""
+        if self._barcode_scanner is None:
+            from utils.professional_barcode_scanner import ProfessionalBarcodeScanner
+            self._barcode_scanner = ProfessionalBarcodeScanner()
+        return self._barcode_scanner
+
     def generate_qr_code(self):
         """Generate QR code for testing and display it"""
         try:
@@ -875,7 +1229,6 @@ class QRScannerFrame(ttk.Frame):
                 return
 
             import qrcode
-            from PIL import Image, ImageTk
 
             # Create sample QR code
             qr = qrcode.QRCode(
@@ -890,7 +1243,6 @@ class QRScannerFrame(ttk.Frame):
             img = qr.make_image(fill_color="black", back_color="white")
 
             # Save to generated_barcodes directory
-            import os
             os.makedirs('generated_barcodes', exist_ok=True)
             filepath = 'generated_barcodes/sample_qr_code.png'
             img.save(filepath)
@@ -898,9 +1250,11 @@ class QRScannerFrame(ttk.Frame):
             # Display the QR code in the UI
             self.display_qr_image(filepath)
 
-            self.add_scan_result("✅ QR code generated: sample_qr_code.png")
-            self.add_scan_result("   You can scan this with your phone!")
-            self.add_scan_result("   📷 QR code displayed on the right!")
+            self.add_scan_results([
+                "✅ QR code generated: sample_qr_code.png",
+                "   You can scan this with your phone!",
+                "   📷 QR code displayed on the right!",
+            ])
 
         except Exception as e:
             self.add_scan_result(f"❌ Error generating QR code: {str(e)}")
@@ -915,20 +1269,12 @@ class QRScannerFrame(ttk.Frame):
                 print("✅ qrcode library loaded successfully")
                 return True
             except ImportError:
-                # Try to install automatically
-                try:
-                    import subprocess
-                    import sys
-                    print("🔄 Installing qrcode library...")
-                    subprocess.check_call([sys.executable, "-m", "pip", "install", "qrcode[pil]", "--quiet"])
-                    import qrcode
-                    QRCODE_AVAILABLE = True
-                    self.add_scan_result("✅ QR code library installed successfully!")
-                    return True
-                except Exception as install_error:
-                    self.add_scan_result("❌ Could not install qrcode library automatically")
-                    self.add_scan_result("💡 Please run: pip install qrcode[pil]")
-                    return False
+                # Installing from here would block the Tk thread for the whole pip run
+                self.add_scan_results([
+                    "❌ QR code library not installed",
+                    "💡 Please run: pip install qrcode[pil]",
+                ])
+                return False
         return True
 
     def generate_and_display_product_qr(self, product, qr_data):
@@ -938,34 +1284,38 @@ class QRScannerFrame(ttk.Frame):
             if not self.ensure_qr_library():
                 return
 
-            product_id, name, sku, qr_code, category_id, cogs, current_stock = product[:7]
+            name = product.name
 
             # Add visual feedback that QR generation is happening
             self.add_scan_result(f"🎨 Generating QR code for: {name}")
 
             # Check if QR image already exists
-            import os
-            import glob
 
             qr_dir = 'generated_barcodes'
             os.makedirs(qr_dir, exist_ok=True)
 
-            # Look for existing QR code image
-            existing_files = glob.glob(os.path.join(qr_dir, f"qr_*{qr_data[:20].replace('/', '_')}*.png"))
+            # Look for existing QR code image (remembered per code after the first glob)
+            existing_file = self._qr_image_paths.get(qr_data)
+            if not existing_file or not os.path.exists(existing_file):
+                existing_files = glob.glob(os.path.join(qr_dir, f"qr_*{qr_data[:20].replace('/', '_')}*.png"))
+                existing_file = existing_files[0] if existing_files else None
 
-            if existing_files:
+            if existing_file:
                 # Use existing QR code image
-                self.display_qr_image(existing_files[0])
+                self._qr_image_paths[qr_data] = existing_file
+                self.display_qr_image(existing_file)
                 self.add_scan_result("📸 QR code displayed from existing file")
             else:
                 # Generate new QR code image
                 self.add_scan_result("🔄 Creating QR code image...")
 
-                from utils.qr_generator import QRGenerator
-                qr_generator = QRGenerator(self.db_manager)
+                qr_generator = self._get_qr_generator()
+                if qr_generator is None:
+                    return
                 image_path, message = qr_generator.generate_qr_image(qr_data)
 
                 if image_path and os.path.exists(image_path):
+                    self._qr_image_paths[qr_data] = image_path
                     self.display_qr_image(image_path)
                     self.add_scan_result(f"✅ QR code ready for: {name}")
                 else:
@@ -973,7 +1323,6 @@ class QRScannerFrame(ttk.Frame):
 
         except Exception as e:
             self.add_scan_result(f"❌ Error generating product QR code: {str(e)}")
-            import traceback
             print(f"QR generation error details: {traceback.format_exc()}")
 
     def generate_and_display_manual_qr(self, qr_data):
@@ -988,14 +1337,17 @@ class QRScannerFrame(ttk.Frame):
             if self.is_camera_on:
                 self.add_scan_result("📷 Camera is active - QR code will appear in display area")
 
-            from utils.qr_generator import QRGenerator
-            qr_generator = QRGenerator(self.db_manager)
+            qr_generator = self._get_qr_generator()
+            if qr_generator is None:
+                return
             image_path, message = qr_generator.generate_qr_image(qr_data)
 
             if image_path and os.path.exists(image_path):
                 self.display_qr_image(image_path)
-                self.add_scan_result("✅ QR code generated and displayed!")
-                self.add_scan_result("📋 You can now scan this QR code or use it for inventory")
+                self.add_scan_results([
+                    "✅ QR code generated and displayed!",
+                    "📋 You can now scan this QR code or use it for inventory",
+                ])
 
                 # Additional helpful info
                 if self.is_camera_on:
@@ -1007,27 +1359,34 @@ class QRScannerFrame(ttk.Frame):
 
         except Exception as e:
             self.add_scan_result(f"❌ Error generating manual QR code: {str(e)}")
-            import traceback
             print(f"Manual QR generation error details: {traceback.format_exc()}")
 
     def display_qr_image(self, image_path):
         """Display QR code image in the UI"""
         try:
-            from PIL import Image, ImageTk
-            import os
-
-            if not os.path.exists(image_path):
+            # One stat both checks the file exists and dates it for the cache key
+            try:
+                mtime = os.path.getmtime(image_path)
+            except OSError:
                 # Use after() to schedule UI update in main thread
                 self.after(0, lambda: self.qr_display_label.config(text=f"QR Code file not found:\n{image_path}"))
                 return
 
-            # Load and resize image for display
-            img = Image.open(image_path)
-            # Resize to fit display area (larger size for better visibility)
-            img.thumbnail((320, 320), Image.Resampling.LANCZOS)
-
-            # Convert to Tkinter format
-            photo = ImageTk.PhotoImage(img)
+            # Scanning the same product again reuses its display image; abspath so
+            # relative and absolute spellings of one file share an entry
+            key = (os.path.abspath(image_path), mtime)
+            photo = self._qr_photo_cache.pop(key, None)
+            if photo is None:
+                # Load and resize image for display; the with block closes the file
+                with Image.open(image_path) as img:
+                    # Resize to fit display area (larger size for better visibility)
+                    img.thumbnail((320, 320), Image.Resampling.LANCZOS)
+
+                    # Convert to Tkinter format
+                    photo = ImageTk.PhotoImage(img)
+            self._qr_photo_cache[key] = photo
+            while len(self._qr_photo_cache) > QR_DISPLAY_CACHE_SIZE:
+                self._qr_photo_cache.popitem(last=False)
 
             # Update display label in main thread
             self.after(0, lambda: self.update_qr_display(photo, image_path))
@@ -1054,8 +1413,10 @@ class QRScannerFrame(ttk.Frame):
                                                foreground="green", font=("Arial", 10, "bold"))
 
             # Add prominent success message
-            self.add_scan_result(f"✅ QR code displayed: {os.path.basename(image_path)}")
-            self.add_scan_result(f"📱 QR code is now visible and ready for scanning!")
+            self.add_scan_results([
+                f"✅ QR code displayed: {os.path.basename(image_path)}",
+                f"📱 QR code is now visible and ready for scanning!",
+            ])
             
         except Exception as e:
             print(f"❌ Error updating QR display: {e}")
@@ -1063,8 +1424,6 @@ class QRScannerFrame(ttk.Frame):
     def show_existing_qr_codes(self):
         """Show existing QR codes from generated_barcodes directory"""
         try:
-            import os
-            import glob
 
             qr_dir = "generated_barcodes"
             if not os.path.exists(qr_dir):
@@ -1082,17 +1441,19 @@ class QRScannerFrame(ttk.Frame):
                 qr_files.extend(glob.glob(pattern))
 
             if not qr_files:
-                self.add_scan_result("❌ No QR code files found")
-                self.add_scan_result("💡 Generate QR codes first using 'Generate QR Codes' button")
+                self.add_scan_results([
+                    "❌ No QR code files found",
+                    "💡 Generate QR codes first using 'Generate QR Codes' button",
+                ])
                 return
 
             # Sort by modification time (newest first)
             qr_files.sort(key=lambda x: os.path.getmtime(x), reverse=True)
 
-            self.add_scan_result(f"📷 Found {len(qr_files)} QR code files:")
-            for i, qr_file in enumerate(qr_files[:5], 1):  # Show first 5
-                filename = os.path.basename(qr_file)
-                self.add_scan_result(f"   {i}. {filename}")
+            lines = [f"📷 Found {len(qr_files)} QR code files:"]
+            lines.extend(f"   {i}. {os.path.basename(qr_file)}"
+                         for i, qr_file in enumerate(qr_files[:5], 1))  # Show first 5
+            self.add_scan_results(lines)
 
             # Display the most recent QR code
             if qr_files:
@@ -1109,9 +1470,9 @@ class QRScannerFrame(ttk.Frame):
             if not self.ensure_qr_library():
                 return
 
-            from utils.qr_generator import QRGenerator
-
-            qr_generator = QRGenerator(self.db_manager)
+            qr_generator = self._get_qr_generator()
+            if qr_generator is None:
+                return
             qr_codes, message = qr_generator.generate_product_qr_codes()
 
             self.add_scan_result(f"📊 {message}")
@@ -1123,23 +1484,71 @@ class QRScannerFrame(ttk.Frame):
 
             # Show the first generated QR code
             if qr_codes:
-                import os
                 image_path = qr_codes[0]['image_path']
                 if os.path.exists(image_path):
                     self.display_qr_image(image_path)
                     self.add_scan_result(f"📸 Displaying: {qr_codes[0]['name']}")
 
-        except ImportError:
-            self.add_scan_result("❌ QR generator not available")
         except Exception as e:
             self.add_scan_result(f"❌ Error generating QR codes: {str(e)}")
     
-    def add_scan_result(self, result):
+    def add_scan_result(self, result, level=None):
+        self.add_scan_results((result,), level)
+
+    def add_scan_results(self, results, level=None):
+        """Queue several log lines under one timestamp and flush them together
+
+        level is a SCAN_LOG_LEVELS key; when omitted it is taken from a leading
+        status emoji. Leading emoji are dropped from the logged text.
+        """
         timestamp = time.strftime("%H:%M:%S")
-        self.results_text.insert(tk.END, f"[{timestamp}] {result}\n")
+        for result in results:
+            text = result.lstrip()
+            indent = result[:len(result) - len(text)]
+            line_level = level
+            head, _, rest = text.partition(" ")
+            if head and not head.isascii() and not head[0].isalnum():  # Emoji, not a word
+                line_level = line_level or SCAN_LOG_EMOJI_LEVELS.get(head)
+                text = rest
+            line_level = line_level or "info"
+            marker = SCAN_LOG_LEVELS[line_level][0]
+            self._log_queue.append((f"[{timestamp}] {indent}{marker}{text}\n", line_level))
+
+        # The capture/scan threads only queue lines; Tk calls stay on the main
+        # thread, where _dispatch_scans schedules the flush for them
+        if threading.current_thread() is threading.main_thread():
+            self._schedule_log_flush()
+
+    def _schedule_log_flush(self):
+        """Flush queued log lines shortly, coalescing bursts (Tk thread only)"""
+        if self._log_queue and not self._log_flush_scheduled:
+            self._log_flush_scheduled = True
+            self.after(100, self._flush_scan_log)
+
+    def _flush_scan_log(self):
+        """Write queued log lines with a single insert and trim old history"""
+        self._log_flush_scheduled = False
+        # Tk's insert takes text/tag pairs, so runs of one level go in as one chunk
+        chunks = []
+        while self._log_queue:
+            line, level = self._log_queue.popleft()
+            if chunks and chunks[-1][1] == level:
+                chunks[-1][0].append(line)
+            else:
+                chunks.append(([line], level))
+        if not chunks:
+            return
+
+        args = []
+        for lines, level in chunks:
+            args.append("".join(lines))
+            args.append(level)
+        self.results_text.insert(tk.END, *args)
+        self.results_text.delete(1.0, f"end-{MAX_SCAN_LOG_LINES + 1}l")
         self.results_text.see(tk.END)
     
     def clear_results(self):
+        self._log_queue.clear()
         self.results_text.delete(1.0, tk.END)
         # Also clear action buttons when clearing results
         if self.action_frame is not None:
@@ -1151,6 +1560,8 @@ class QRScannerFrame(ttk.Frame):
     def show(self):
         """Show the barcode scanner frame"""
         self.pack(fill=tk.BOTH, expand=True)
+        self.invalidate_category_cache()  # Categories may have changed elsewhere
+        self._forget_cached_products()  # ...and so may products and stock
     
     def hide(self):
         """Hide the barcode scanner frame"""
@@ -1172,26 +1583,32 @@ class QRScannerFrame(ttk.Frame):
             # Look for barcode patterns (simplified approach)
             # This is a basic implementation - looks for vertical line patterns
             
-            # Find contours
-            contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            # Find contours on a half-resolution copy; barcodes survive the downscale
+            _, small_binary = cv2.threshold(cv2.pyrDown(gray), 127, 255, cv2.THRESH_BINARY)
+            contours, _ = cv2.findContours(small_binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
             
-            for contour in contours:
-                # Get bounding rectangle
-                x, y, w, h = cv2.boundingRect(contour)
+            if not contours:
+                return None
+            
+            # Check all bounding rectangles at once for barcode shape (wide and not too tall),
+            # using half-resolution thresholds
+            boxes = np.array([cv2.boundingRect(contour) for contour in contours])
+            widths, heights = boxes[:, 2], boxes[:, 3]
+            candidates = boxes[(widths > 50) & (heights < widths / 3) & (heights > 10)] * 2
+            
+            for x, y, w, h in candidates:
+                # Extract the region
+                roi = binary[y:y+h, x:x+w]
                 
-                # Check if it might be a barcode (wide and not too tall)
-                if w > 100 and h < w/3 and h > 20:
-                    # Extract the region
-                    roi = binary[y:y+h, x:x+w]
-                    
-                    # Simple pattern analysis
-                    # This is a very basic approach - in production you'd want more sophisticated algorithms
-                    lines = self.analyze_barcode_lines(roi)
-                    if lines:
-                        # Generate a simple barcode based on line patterns
-                        # This is a placeholder - real implementation would decode actual patterns
-                        barcode_data = f"ALT{hash(str(lines)) % 1000000:06d}"
-                        return barcode_data
+                # Simple pattern analysis
+                # This is a very basic approach - in production you'd want more sophisticated algorithms
+                widths = self.analyze_barcode_lines(roi)
+                if widths is not None:
+                    # Generate a simple barcode from an order-sensitive checksum of the bar widths
+                    # This is a placeholder - real implementation would decode actual patterns
+                    signature = int(np.dot(widths, np.arange(1, widths.size + 1)))
+                    barcode_data = f"ALT{signature % 1000000:06d}"
+                    return barcode_data
             
             return None
             
@@ -1205,32 +1622,23 @@ class QRScannerFrame(ttk.Frame):
             if not NUMPY_AVAILABLE:
                 return None
                 
-            # Sum pixels vertically to get line pattern
-            vertical_sum = np.sum(roi, axis=0)
+            # Sum pixels vertically to get line pattern (OpenCV's SIMD reduce when available)
+            if CV2_AVAILABLE:
+                vertical_sum = cv2.reduce(roi, 0, cv2.REDUCE_SUM, dtype=cv2.CV_32S).ravel()
+            else:
+                vertical_sum = np.sum(roi, axis=0)
             
             # Find peaks and valleys
             threshold = np.mean(vertical_sum) * 0.5
-            lines = []
+            is_white = vertical_sum > threshold
             
-            current_state = 'white' if vertical_sum[0] > threshold else 'black'
-            current_width = 1
+            # Run-length encode the white/black columns in one vectorized pass
+            run_starts = np.concatenate(([0], np.flatnonzero(np.diff(is_white.astype(np.int8))) + 1))
+            run_widths = np.diff(np.concatenate((run_starts, [is_white.size])))
             
-            for i in range(1, len(vertical_sum)):
-                pixel_state = 'white' if vertical_sum[i] > threshold else 'black'
-                
-                if pixel_state == current_state:
-                    current_width += 1
-                else:
-                    lines.append((current_state, current_width))
-                    current_state = pixel_state
-                    current_width = 1
-            
-            # Add the last segment
-            lines.append((current_state, current_width))
-            
-            # Return pattern if it looks like a barcode (alternating black/white)
-            if len(lines) > 10:  # Minimum number of bars for a barcode
-                return lines
+            # Return bar widths if it looks like a barcode (alternating black/white)
+            if len(run_widths) > 10:  # Minimum number of bars for a barcode
+                return run_widths
             
             return None
             
@@ -1298,25 +1706,25 @@ class QRScannerFrame(ttk.Frame):
         
         # Simple input dialog
         quantity = tk.simpledialog.askinteger("Stock In", 
-            f"Add stock for: {self.current_product[1]}\\n\\n"
-            f"Current Stock: {self.current_product[6]}\\n"
+            f"Add stock for: {self.current_product.name}\\n\\n"
+            f"Current Stock: {self.current_product.stock}\\n"
             "Enter quantity to add:", 
             minvalue=1, maxvalue=1000)
         
         if quantity:
             try:
-                # Update stock in database
-                new_stock = self.current_product[6] + quantity
-                success = self.db_manager.update_stock(self.current_product[0], new_stock)
+                # Add to the stored stock in SQL, not to our possibly stale copy
+                new_stock = self.db_manager.apply_stock_delta(self.current_product.id, quantity)
+                self._forget_cached_products()
                 
-                if success:
-                    self.add_scan_result(f"✅ Stock In: +{quantity} units")
-                    self.add_scan_result(f"   New Stock: {new_stock}")
+                if new_stock is not None:
+                    self.add_scan_results([
+                        f"✅ Stock In: +{quantity} units",
+                        f"   New Stock: {new_stock}",
+                    ])
                     
                     # Update current product data
-                    product_list = list(self.current_product)
-                    product_list[6] = new_stock
-                    self.current_product = tuple(product_list)
+                    self.current_product.stock = new_stock
                 else:
                     self.add_scan_result("❌ Failed to update stock")
                     
@@ -1328,35 +1736,35 @@ class QRScannerFrame(ttk.Frame):
         if not self.current_product:
             return
         
-        current_stock = self.current_product[6]
+        current_stock = self.current_product.stock
         
         # Simple input dialog
         quantity = tk.simpledialog.askinteger("Stock Out", 
-            f"Remove stock for: {self.current_product[1]}\\n\\n"
+            f"Remove stock for: {self.current_product.name}\\n\\n"
             f"Current Stock: {current_stock}\\n"
             "Enter quantity to remove:", 
             minvalue=1, maxvalue=current_stock)
         
         if quantity:
             try:
-                # Update stock in database
-                new_stock = current_stock - quantity
-                success = self.db_manager.update_stock(self.current_product[0], new_stock)
+                # Subtract in SQL; the UPDATE refuses to take stock below zero
+                new_stock = self.db_manager.apply_stock_delta(self.current_product.id, -quantity)
+                self._forget_cached_products()
                 
-                if success:
-                    self.add_scan_result(f"✅ Stock Out: -{quantity} units")
-                    self.add_scan_result(f"   New Stock: {new_stock}")
+                if new_stock is not None:
+                    self.add_scan_results([
+                        f"✅ Stock Out: -{quantity} units",
+                        f"   New Stock: {new_stock}",
+                    ])
                     
                     # Update current product data
-                    product_list = list(self.current_product)
-                    product_list[6] = new_stock
-                    self.current_product = tuple(product_list)
+                    self.current_product.stock = new_stock
                     
                     # Check for low stock
                     if new_stock <= 10:
                         self.add_scan_result(f"⚠️ LOW STOCK WARNING!")
                 else:
-                    self.add_scan_result("❌ Failed to update stock")
+                    self.add_scan_result("❌ Failed to update stock (insufficient stock?)")
                     
             except Exception as e:
                 self.add_scan_result(f"❌ Error: {str(e)}")
@@ -1370,21 +1778,42 @@ class QRScannerFrame(ttk.Frame):
         self.create_sale_dialog()
     
     def create_sale_dialog(self):
-        """Create dialog for quick sale"""
+        """Show the quick sale dialog for the current product"""
+        # The dialog is built once and hidden between sales
+        if self._sale_dialog is None or not self._sale_dialog.winfo_exists():
+            self._build_sale_dialog()
+
+        # Pinned here: later scans replace current_product while the dialog is open
+        product = self._sale_product = self.current_product
+        self._sale_name_label.config(text=f"Product: {product.name}")
+        self._sale_stock_label.config(text=f"Current Stock: {product.stock} units")
+        self._sale_cogs_label.config(text=f"COGS: PKR {product.cogs:.2f}")
+        self._sale_qty_var.set("1")
+        self._sale_price_var.set(str(product.cogs * 1.5))  # Suggest 50% markup
+        self._calculate_sale_profit()
+
+        self._sale_dialog.deiconify()
+        self._sale_dialog.lift()
+
+    def _build_sale_dialog(self):
+        """Create the quick sale dialog widgets"""
         dialog = tk.Toplevel(self.parent)
         dialog.title("Quick Sale")
         dialog.geometry("400x300")
         dialog.configure(bg="#fdf7f2")  # Brand background color
+        dialog.protocol("WM_DELETE_WINDOW", dialog.withdraw)
+        self._sale_dialog = dialog
         
         # Product info
-        product = self.current_product
         info_frame = ttk.LabelFrame(dialog, text="Product Information", padding=10)
         info_frame.pack(fill="x", padx=20, pady=10)
         
-        ttk.Label(info_frame, text=f"Product: {product[1]}", 
-                 font=("Arial", 10, "bold")).pack(anchor="w")
-        ttk.Label(info_frame, text=f"Current Stock: {product[6]} units").pack(anchor="w")
-        ttk.Label(info_frame, text=f"COGS: PKR {product[5]:.2f}").pack(anchor="w")
+        self._sale_name_label = ttk.Label(info_frame, font=("Arial", 10, "bold"))
+        self._sale_name_label.pack(anchor="w")
+        self._sale_stock_label = ttk.Label(info_frame)
+        self._sale_stock_label.pack(anchor="w")
+        self._sale_cogs_label = ttk.Label(info_frame)
+        self._sale_cogs_label.pack(anchor="w")
         
         # Sale inputs
         sale_frame = ttk.LabelFrame(dialog, text="Sale Details", padding=10)
@@ -1392,118 +1821,119 @@ class QRScannerFrame(ttk.Frame):
         
         # Quantity
         ttk.Label(sale_frame, text="Quantity:").grid(row=0, column=0, sticky="w", pady=5)
-        quantity_var = tk.StringVar(value="1")
-        quantity_entry = ttk.Entry(sale_frame, textvariable=quantity_var, width=10)
+        self._sale_qty_var = tk.StringVar(value="1")
+        quantity_entry = ttk.Entry(sale_frame, textvariable=self._sale_qty_var, width=10)
         quantity_entry.grid(row=0, column=1, sticky="w", padx=10)
         
         # Selling Price
         ttk.Label(sale_frame, text="Selling Price (PKR ):").grid(row=1, column=0, sticky="w", pady=5)
-        price_var = tk.StringVar(value=str(product[5] * 1.5))  # Suggest 50% markup
-        price_entry = ttk.Entry(sale_frame, textvariable=price_var, width=10)
+        self._sale_price_var = tk.StringVar()
+        price_entry = ttk.Entry(sale_frame, textvariable=self._sale_price_var, width=10)
         price_entry.grid(row=1, column=1, sticky="w", padx=10)
         
         # Profit calculation
-        profit_label = ttk.Label(sale_frame, text="", foreground="#fc68ae", font=("Arial", 10, "bold"))
-        profit_label.grid(row=2, column=0, columnspan=2, pady=10)
-        
-        def calculate_profit():
-            try:
-                qty = int(quantity_var.get())
-                price = float(price_var.get())
-                profit = qty * (price - product[5])
-                revenue = qty * price
-                profit_label.config(text=f"Revenue: PKR {revenue:.2f} | Profit: PKR {profit:.2f}")
-            except:
-                profit_label.config(text="Invalid input")
+        self._sale_profit_label = ttk.Label(sale_frame, text="", foreground="#fc68ae", font=("Arial", 10, "bold"))
+        self._sale_profit_label.grid(row=2, column=0, columnspan=2, pady=10)
         
-        # Bind calculation to entry changes
-        quantity_var.trace("w", lambda *args: calculate_profit())
-        price_var.trace("w", lambda *args: calculate_profit())
-        calculate_profit()  # Initial calculation
+        # Recalculate once typing pauses instead of on every keystroke
+        self._sale_profit_after = None
+        self._sale_qty_var.trace("w", self._schedule_sale_profit)
+        self._sale_price_var.trace("w", self._schedule_sale_profit)
         
         # Buttons
         button_frame = ttk.Frame(dialog)
         button_frame.pack(fill="x", padx=20, pady=20)
         
-        def confirm_sale():
-            try:
-                quantity = int(quantity_var.get())
-                selling_price = float(price_var.get())
+        ttk.Button(button_frame, text="Record Sale", command=self._confirm_sale).pack(side="right", padx=5)
+        ttk.Button(button_frame, text="Cancel", command=dialog.withdraw).pack(side="right", padx=5)
+
+    def _schedule_sale_profit(self, *args):
+        """Debounce profit recalculation while the user is typing"""
+        if self._sale_profit_after is not None:
+            self._sale_dialog.after_cancel(self._sale_profit_after)
+        self._sale_profit_after = self._sale_dialog.after(50, self._calculate_sale_profit)
+
+    def _calculate_sale_profit(self):
+        """Update the quick sale dialog's revenue/profit line"""
+        self._sale_profit_after = None
+        try:
+            qty = int(self._sale_qty_var.get())
+            price = float(self._sale_price_var.get())
+            profit = qty * (price - self._sale_product.cogs)
+            revenue = qty * price
+            self._sale_profit_label.config(text=f"Revenue: PKR {revenue:.2f} | Profit: PKR {profit:.2f}")
+        except (ValueError, TypeError):
+            self._sale_profit_label.config(text="Invalid input")
+
+    def _confirm_sale(self):
+        """Record the sale entered in the quick sale dialog"""
+        product = self._sale_product
+        try:
+            quantity = int(self._sale_qty_var.get())
+            selling_price = float(self._sale_price_var.get())
+            
+            if quantity <= 0 or selling_price <= 0:
+                messagebox.showerror("Error", "Quantity and price must be positive")
+                return
+            
+            # Record sale; add_sale's guarded UPDATE checks stock against the
+            # database, not the row cached when the code was scanned
+            sale_date = datetime.now().isoformat()
+            
+            new_stock = self.db_manager.add_sale(
+                product.id, quantity, selling_price, sale_date
+            )
+            self._forget_cached_products()
+            
+            if new_stock is not None:
                 
-                if quantity <= 0 or selling_price <= 0:
-                    messagebox.showerror("Error", "Quantity and price must be positive")
-                    return
+                # Show success
+                revenue = quantity * selling_price
+                profit = quantity * (selling_price - product.cogs)
                 
-                if quantity > product[6]:
-                    messagebox.showerror("Error", f"Not enough stock. Available: {product[6]}")
-                    return
+                self.add_scan_results([
+                    "✅ SALE RECORDED",
+                    f"   Quantity: {quantity}",
+                    f"   Revenue: PKR {revenue:.2f}",
+                    f"   Profit: PKR {profit:.2f}",
+                    f"   Remaining Stock: {new_stock}",
+                ])
                 
-                # Record sale
-                from datetime import datetime
-                sale_date = datetime.now().isoformat()
+                self._sale_dialog.withdraw()
                 
-                success = self.db_manager.add_sale(
-                    product[0], quantity, selling_price, sale_date
-                )
+                # Update the sold product (also current_product unless a scan replaced it)
+                product.stock = new_stock
+            else:
+                messagebox.showerror("Error", "Failed to record sale - not enough stock?")
                 
-                if success:
-                    # Update stock
-                    new_stock = product[6] - quantity
-                    self.db_manager.update_stock(product[0], new_stock)
-                    
-                    # Show success
-                    revenue = quantity * selling_price
-                    profit = quantity * (selling_price - product[5])
-                    
-                    self.add_scan_result(f"✅ SALE RECORDED")
-                    self.add_scan_result(f"   Quantity: {quantity}")
-                    self.add_scan_result(f"   Revenue: PKR {revenue:.2f}")
-                    self.add_scan_result(f"   Profit: PKR {profit:.2f}")
-                    self.add_scan_result(f"   Remaining Stock: {new_stock}")
-                    
-                    dialog.destroy()
-                    
-                    # Update current product
-                    product_list = list(self.current_product)
-                    product_list[6] = new_stock
-                    self.current_product = tuple(product_list)
-                else:
-                    messagebox.showerror("Error", "Failed to record sale")
-                    
-            except ValueError:
-                messagebox.showerror("Error", "Please enter valid numbers")
-            except Exception as e:
-                messagebox.showerror("Error", f"Sale failed: {str(e)}")
-        
-        ttk.Button(button_frame, text="Record Sale", command=confirm_sale).pack(side="right", padx=5)
-        ttk.Button(button_frame, text="Cancel", command=dialog.destroy).pack(side="right", padx=5)
+        except ValueError:
+            messagebox.showerror("Error", "Please enter valid numbers")
+        except Exception as e:
+            messagebox.showerror("Error", f"Sale failed: {str(e)}")
     
     def generate_product_qr_code(self):
         """Generate QR code for current product"""
         if not self.current_product:
             return
 
-        try:
-            from utils.qr_generator import QRGenerator
+        generator = self._get_qr_generator()
+        if generator is None:
+            return
 
-            generator = QRGenerator(self.db_manager)
+        try:
             product = self.current_product
 
             # Generate QR code if not exists
-            qr_code = product[3]
+            qr_code = product.qr_code
             if not qr_code or qr_code.strip() == "":
                 # Generate new QR code
-                category_name = ""
-                categories = self.db_manager.get_categories()
-                for cat in categories:
-                    if cat[0] == product[4]:
-                        category_name = cat[1]
-                        break
+                category_name = self._get_category_map().get(product.category_id, "")
 
-                sku, qr_code = generator.generate_sku_qr_code(product[1], category_name)
+                sku, qr_code = generator.generate_sku_qr_code(product.name, category_name)
 
                 # Update database
-                success = self.db_manager.update_product_barcode(product[0], qr_code)
+                success = self.db_manager.update_product_barcode(product.id, qr_code)
+                self._forget_cached_products()
                 if not success:
                     self.add_scan_result("❌ Failed to update product QR code")
                     return
@@ -1512,31 +1942,59 @@ class QRScannerFrame(ttk.Frame):
             image_path, message = generator.generate_qr_image(qr_code)
 
             if image_path:
-                self.add_scan_result(f"✅ QR code generated: {qr_code}")
-                self.add_scan_result(f"   Saved to: {image_path}")
+                self.add_scan_results([
+                    f"✅ QR code generated: {qr_code}",
+                    f"   Saved to: {image_path}",
+                ])
 
                 # Show QR code image
                 self.show_qr_image(image_path)
             else:
                 self.add_scan_result(f"❌ Failed to generate QR code: {message}")
 
-        except ImportError:
-            self.add_scan_result("❌ QR generator not available")
         except Exception as e:
             self.add_scan_result(f"❌ Error generating QR code: {str(e)}")
     
+    def _get_qr_generator(self):
+        """Get the frame's QRGenerator, or log and return None if it failed to import"""
+        if QRGenerator is None:
+            self.add_scan_result("❌ QR generator not available")
+            return None
+        if self._qr_generator is None:
+            self._qr_generator = QRGenerator(self.db_manager)
+        return self._qr_generator
+
     def show_qr_image(self, image_path):
         """Show generated QR code image"""
+        # Decode and resize off the Tk thread; the PhotoImage is built in the callback
+        self._run_in_background(lambda f: self._show_qr_popup(f, image_path),
+                                self._load_qr_preview, image_path)
+
+    @staticmethod
+    def _load_qr_preview(image_path):
+        """Load a QR image resized for the popup (runs on the worker pool)"""
+        # Images generated by QRGenerator come with a pre-resized copy
+        if thumbnail_path is not None:
+            thumb_path = thumbnail_path(image_path)
+            if thumb_path.exists():
+                # Image.open is lazy; load() decodes here rather than on the Tk thread
+                with Image.open(thumb_path) as img:
+                    img.load()
+                    return img
+
+        with Image.open(image_path) as img:
+            return img.resize((400, 400), Image.Resampling.LANCZOS)  # QR codes need square display
+
+    def _show_qr_popup(self, future, image_path):
+        """Display a loaded QR image in a popup (runs on the Tk main thread)"""
         try:
+            img = future.result()
+
             # Create popup window
             popup = tk.Toplevel(self.parent)
             popup.title("Generated QR Code")
             popup.configure(bg="#fdf7f2")
 
-            # Load and display image
-            from PIL import Image, ImageTk
-            img = Image.open(image_path)
-            img = img.resize((400, 400), Image.Resampling.LANCZOS)  # QR codes need square display
             photo = ImageTk.PhotoImage(img)
 
             label = ttk.Label(popup, image=photo)
@@ -1565,9 +2023,16 @@ class QRScannerFrame(ttk.Frame):
             )
 
             if filename:
-                import shutil
-                shutil.copy2(source_path, filename)
-                messagebox.showinfo("Success", f"QR code saved to:\\n{filename}")
+                self._run_in_background(lambda f: self._on_qr_saved(f, filename),
+                                        shutil.copy2, source_path, filename)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save QR code: {str(e)}")
+
+    def _on_qr_saved(self, future, filename):
+        """Report the result of save_qr_as (runs on the Tk main thread)"""
+        try:
+            future.result()
+            messagebox.showinfo("Success", f"QR code saved to:\\n{filename}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save QR code: {str(e)}")
     
@@ -1581,11 +2046,37 @@ class QRScannerFrame(ttk.Frame):
             self.create_product_dialog(qr_data)
     
     def create_product_dialog(self, qr_code):
-        """Create dialog for new product creation"""
+        """Show the new product dialog pre-filled with a scanned QR code"""
+        # The dialog is built once and hidden between uses
+        if self._product_dialog is None or not self._product_dialog.winfo_exists():
+            self._build_product_dialog()
+
+        # Refresh category choices only when the category cache was rebuilt
+        category_map = self._get_category_map()
+        if category_map is not self._product_dialog_categories:
+            self._product_dialog_categories = category_map
+            self._new_category_combo['values'] = list(category_map.values())
+
+        category_names = self._new_category_combo['values']
+        self._new_name_var.set("")
+        self._new_sku_var.set("")
+        self._new_qr_code_var.set(qr_code)
+        self._new_category_var.set(category_names[0] if category_names else "")
+        self._new_cogs_var.set("")
+        self._new_stock_var.set("0")
+
+        self._product_dialog.deiconify()
+        self._product_dialog.lift()
+
+    def _build_product_dialog(self):
+        """Create the new product dialog widgets"""
         dialog = tk.Toplevel(self.parent)
         dialog.title("Create New Product")
         dialog.geometry("500x400")
         dialog.configure(bg="#fdf7f2")
+        dialog.protocol("WM_DELETE_WINDOW", dialog.withdraw)
+        self._product_dialog = dialog
+        self._product_dialog_categories = None
 
         # Form frame
         form_frame = ttk.LabelFrame(dialog, text="Product Details", padding=20)
@@ -1593,39 +2084,35 @@ class QRScannerFrame(ttk.Frame):
 
         # Product Name
         ttk.Label(form_frame, text="Product Name:").grid(row=0, column=0, sticky="w", pady=5)
-        name_var = tk.StringVar()
-        ttk.Entry(form_frame, textvariable=name_var, width=30).grid(row=0, column=1, sticky="ew", padx=10)
+        self._new_name_var = tk.StringVar()
+        ttk.Entry(form_frame, textvariable=self._new_name_var, width=30).grid(row=0, column=1, sticky="ew", padx=10)
 
         # SKU
         ttk.Label(form_frame, text="SKU:").grid(row=1, column=0, sticky="w", pady=5)
-        sku_var = tk.StringVar()
-        ttk.Entry(form_frame, textvariable=sku_var, width=30).grid(row=1, column=1, sticky="ew", padx=10)
+        self._new_sku_var = tk.StringVar()
+        ttk.Entry(form_frame, textvariable=self._new_sku_var, width=30).grid(row=1, column=1, sticky="ew", padx=10)
 
         # QR Code (pre-filled)
         ttk.Label(form_frame, text="QR Code:").grid(row=2, column=0, sticky="w", pady=5)
-        qr_code_var = tk.StringVar(value=qr_code)
-        ttk.Entry(form_frame, textvariable=qr_code_var, width=30).grid(row=2, column=1, sticky="ew", padx=10)
+        self._new_qr_code_var = tk.StringVar()
+        ttk.Entry(form_frame, textvariable=self._new_qr_code_var, width=30).grid(row=2, column=1, sticky="ew", padx=10)
         
         # Category
         ttk.Label(form_frame, text="Category:").grid(row=3, column=0, sticky="w", pady=5)
-        category_var = tk.StringVar()
-        categories = self.db_manager.get_categories()
-        category_names = [cat[1] for cat in categories]
-        category_combo = ttk.Combobox(form_frame, textvariable=category_var, 
-                                     values=category_names, state="readonly", width=27)
-        category_combo.grid(row=3, column=1, sticky="ew", padx=10)
-        if category_names:
-            category_combo.set(category_names[0])
+        self._new_category_var = tk.StringVar()
+        self._new_category_combo = ttk.Combobox(form_frame, textvariable=self._new_category_var, 
+                                               state="readonly", width=27)
+        self._new_category_combo.grid(row=3, column=1, sticky="ew", padx=10)
         
         # COGS
         ttk.Label(form_frame, text="COGS (PKR ):").grid(row=4, column=0, sticky="w", pady=5)
-        cogs_var = tk.StringVar()
-        ttk.Entry(form_frame, textvariable=cogs_var, width=30).grid(row=4, column=1, sticky="ew", padx=10)
+        self._new_cogs_var = tk.StringVar()
+        ttk.Entry(form_frame, textvariable=self._new_cogs_var, width=30).grid(row=4, column=1, sticky="ew", padx=10)
         
         # Initial Stock
         ttk.Label(form_frame, text="Initial Stock:").grid(row=5, column=0, sticky="w", pady=5)
-        stock_var = tk.StringVar(value="0")
-        ttk.Entry(form_frame, textvariable=stock_var, width=30).grid(row=5, column=1, sticky="ew", padx=10)
+        self._new_stock_var = tk.StringVar(value="0")
+        ttk.Entry(form_frame, textvariable=self._new_stock_var, width=30).grid(row=5, column=1, sticky="ew", padx=10)
         
         # Configure grid weights
         form_frame.grid_columnconfigure(1, weight=1)
@@ -1634,85 +2121,107 @@ class QRScannerFrame(ttk.Frame):
         button_frame = ttk.Frame(dialog)
         button_frame.pack(fill="x", padx=20, pady=20)
         
-        def create_product():
+        ttk.Button(button_frame, text="Create Product", command=self._create_product).pack(side="right", padx=5)
+        ttk.Button(button_frame, text="Cancel", command=dialog.withdraw).pack(side="right", padx=5)
+
+    def _create_product(self):
+        """Create a product from the new product dialog"""
+        try:
+            name = self._new_name_var.get().strip()
+            qr_code = self._new_qr_code_var.get().strip()
+
+            # Validate inputs
+            if not name:
+                messagebox.showerror("Error", "Product name is required")
+                return
+            
+            if not self._new_category_var.get():
+                messagebox.showerror("Error", "Please select a category")
+                return
+            
             try:
-                # Validate inputs
-                if not name_var.get().strip():
-                    messagebox.showerror("Error", "Product name is required")
-                    return
-                
-                if not category_var.get():
-                    messagebox.showerror("Error", "Please select a category")
-                    return
-                
-                try:
-                    cogs = float(cogs_var.get())
-                    stock = int(stock_var.get())
-                except ValueError:
-                    messagebox.showerror("Error", "COGS must be a number and stock must be an integer")
-                    return
-                
-                # Get category ID
-                category_id = None
-                for cat in categories:
-                    if cat[1] == category_var.get():
-                        category_id = cat[0]
-                        break
+                cogs = float(self._new_cogs_var.get())
+                stock = int(self._new_stock_var.get())
+            except ValueError:
+                messagebox.showerror("Error", "COGS must be a number and stock must be an integer")
+                return
+            
+            # Get category ID
+            category_id = self._get_category_ids().get(self._new_category_var.get())
+            
+            # Create product
+            success = self.db_manager.add_product(
+                name,
+                self._new_sku_var.get().strip() or None,
+                qr_code,
+                category_id,
+                cogs,
+                stock
+            )
+            self._forget_cached_products()
+
+            if success:
+                self.add_scan_results([
+                    f"✅ Product created: {name}",
+                    f"   QR Code: {qr_code}",
+                    f"   Stock: {stock}",
+                ])
+                self._product_dialog.withdraw()
+
+                # Look up the newly created product
+                self.lookup_product(qr_code)
+            else:
+                messagebox.showerror("Error", "Failed to create product. QR code may already exist.")
                 
-                # Create product
-                success = self.db_manager.add_product(
-                    name_var.get().strip(),
-                    sku_var.get().strip() or None,
-                    qr_code_var.get().strip(),
-                    category_id,
-                    cogs,
-                    stock
-                )
-
-                if success:
-                    self.add_scan_result(f"✅ Product created: {name_var.get()}")
-                    self.add_scan_result(f"   QR Code: {qr_code_var.get()}")
-                    self.add_scan_result(f"   Stock: {stock}")
-                    dialog.destroy()
-
-                    # Look up the newly created product
-                    self.lookup_product(qr_code_var.get())
-                else:
-                    messagebox.showerror("Error", "Failed to create product. QR code may already exist.")
-                    
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to create product: {str(e)}")
-        
-        ttk.Button(button_frame, text="Create Product", command=create_product).pack(side="right", padx=5)
-        ttk.Button(button_frame, text="Cancel", command=dialog.destroy).pack(side="right", padx=5)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to create product: {str(e)}")
     
     def generate_all_qr_codes(self):
         """Generate QR codes for all products"""
+        generator = self._get_qr_generator()
+        if generator is None:
+            return
+
         try:
-            from utils.qr_generator import QRGenerator
+            self.add_scan_result("🔄 Generating QR codes...")
+            self._run_in_background(self._on_all_qr_codes_generated, generator.generate_product_qr_codes)
 
-            generator = QRGenerator(self.db_manager)
-            qr_codes, message = generator.generate_product_qr_codes()
+        except Exception as e:
+            self.add_scan_result(f"❌ Error generating QR codes: {str(e)}")
 
-            self.add_scan_result(f"📊 {message}")
-            for item in qr_codes[:5]:  # Show first 5
-                self.add_scan_result(f"   ✅ {item['name']}: {item['qr_code']}")
+    def _on_all_qr_codes_generated(self, future):
+        """Report generate_all_qr_codes results (runs on the Tk main thread)"""
+        try:
+            qr_codes, message = future.result()
+            self._forget_cached_products()  # Products may have new QR codes
+
+            lines = [f"📊 {message}"]
+            lines.extend(f"   ✅ {item['name']}: {item['qr_code']}" for item in qr_codes[:5])  # Show first 5
 
             if len(qr_codes) > 5:
-                self.add_scan_result(f"   ... and {len(qr_codes) - 5} more")
+                lines.append(f"   ... and {len(qr_codes) - 5} more")
+            self.add_scan_results(lines)
 
-        except ImportError:
-            self.add_scan_result("❌ QR generator not available")
         except Exception as e:
             self.add_scan_result(f"❌ Error generating QR codes: {str(e)}")
     
     def create_print_sheet(self):
         """Create printable QR code sheet"""
+        generator = self._get_qr_generator()
+        if generator is None:
+            return
+
         try:
-            from utils.qr_generator import QRGenerator
+            self.add_scan_result("🔄 Creating QR print sheet...")
+            self._run_in_background(self._on_print_sheet_created, generator.create_qr_print_sheet)
 
-            generator = QRGenerator(self.db_manager)
-            pdf_path, message = generator.create_qr_print_sheet()
+        except Exception as e:
+            self.add_scan_result(f"❌ Error creating print sheet: {str(e)}")
+
+    def _on_print_sheet_created(self, future):
+        """Report create_print_sheet results (runs on the Tk main thread)"""
+        try:
+            pdf_path, message = future.result()
 
             if pdf_path:
                 self.add_scan_result(f"✅ QR print sheet created: {pdf_path}")
@@ -1724,69 +2233,17 @@ class QRScannerFrame(ttk.Frame):
                     "Would you like to open it now?")
 
                 if result:
-                    import os
                     os.startfile(pdf_path)  # Windows
             else:
                 self.add_scan_result(f"❌ Failed to create print sheet: {message}")
 
-        except ImportError:
-            self.add_scan_result("❌ PDF generator not available - install reportlab")
         except Exception as e:
             self.add_scan_result(f"❌ Error creating print sheet: {str(e)}")
     
-    def is_reasonable_qr_code(self, qr_data: str) -> bool:
-        """Check if detected QR code is reasonable (not random noise)"""
-        try:
-            if not qr_data or len(qr_data.strip()) < 2:
-                return False
-
-            clean_data = qr_data.strip()
-
-            # Check for minimum content requirements
-            if len(clean_data) < 2:
-                return False
-
-            # Check for reasonable character distribution
-            if len(set(clean_data)) < 2 and len(clean_data) > 10:
-                # All same characters is likely noise
-                return False
-
-            # Check for URL patterns (common QR content)
-            import re
-            url_pattern = re.compile(r'^(https?://|www\.|ftp://)')
-            if url_pattern.match(clean_data.lower()):
-                return True
-
-            # Check for email patterns
-            email_pattern = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
-            if email_pattern.match(clean_data):
-                return True
-
-            # Check for phone numbers
-            phone_pattern = re.compile(r'^\+?[\d\s\-\(\)]{7,}$')
-            if phone_pattern.match(clean_data):
-                return True
-
-            # Check for product codes (alphanumeric with reasonable length)
-            product_pattern = re.compile(r'^[A-Z0-9\-_\.]{3,50}$', re.IGNORECASE)
-            if product_pattern.match(clean_data):
-                return True
-
-            # Allow text content
-            if len(clean_data) >= 3 and len(clean_data) <= 500:
-                return True
+    def destroy(self):
+        """Release the worker pool when the frame is torn down (e.g. DB reset)"""
+        self._io_pool.shutdown(wait=False)
+        super().destroy()
 
-            # Additional checks for existing products
-            # If QR code exists in database, it's definitely valid
-            existing_product = self.db_manager.get_product_by_barcode(clean_data)
-            if existing_product:
-                return True
-
-            return False
-
-        except Exception as e:
-            print(f"QR code validation error: {e}")
-            return True  # Default to true if validation fails
-    
     def on_closing(self):
         self.stop_camera()
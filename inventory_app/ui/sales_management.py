@@ -8,6 +8,8 @@ from tkinter import ttk, messagebox, simpledialog
 from datetime import datetime, date
 import re
 
+from utils.validators import Validators
+
 class SalesManagementFrame:
     """Sales management frame"""
 
@@ -35,6 +37,7 @@ class SalesManagementFrame:
         # Initialize data
         self.selected_sale = None
         self.products = []
+        self.category_ids = {}  # {name: category_id}, rebuilt by load_products
         self.load_products()
 
     def create_header(self):
@@ -333,6 +336,7 @@ class SalesManagementFrame:
 
             # Load categories for filter
             categories = self.db_manager.get_categories()
+            self.category_ids = {cat[1]: cat[0] for cat in categories}
             category_names = ["All Categories"] + [cat[1] for cat in categories]
             self.category_filter_combo['values'] = category_names
 
@@ -353,9 +357,10 @@ class SalesManagementFrame:
 
     def load_sales(self):
         """Load sales into table"""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        # Clear existing items in one Tk call
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
 
         try:
             # Get filter values
@@ -372,23 +377,20 @@ class SalesManagementFrame:
             # Get category ID if specific category selected
             category_id = None
             if category_name != "All Categories":
-                categories = self.db_manager.get_categories()
-                for cat in categories:
-                    if cat[1] == category_name:
-                        category_id = cat[0]
-                        break
+                category_id = self.category_ids.get(category_name)
 
             sales = self.db_manager.get_sales(from_date if from_date else None,
                                             to_date if to_date else None,
                                             category_id)
 
+            insert = self.tree.insert
             for sale in sales:
                 # Format values
                 sell_price = f"PKR {sale[3]:.2f}"
                 revenue = f"PKR {sale[4]:.2f}"
                 profit = f"PKR {sale[5]:.2f}"
 
-                self.tree.insert("", tk.END, values=(
+                insert("", tk.END, values=(
                     sale[0],   # ID
                     sale[1],   # Product Name
                     sale[2],   # Quantity
@@ -535,14 +537,14 @@ class SalesManagementFrame:
                 messagebox.showerror("Database Error", "Cannot connect to database. Please restart the application.")
                 return
 
-            success = self.db_manager.add_sale(
+            new_stock = self.db_manager.add_sale(
                 data['product_id'],
                 data['quantity'],
                 data['selling_price'],
                 data['date']
             )
 
-            if success:
+            if new_stock is not None:
                 messagebox.showinfo("Success", "Sale added successfully!")
                 self.clear_sale_form()
                 self.load_sales()
@@ -579,7 +581,7 @@ class SalesManagementFrame:
 
         # Ask for admin password
         password = simpledialog.askstring("Admin Password", "Enter admin password to delete:", show='*')
-        if password != "admin123":  # Default password
+        if not Validators.check_admin_password(password):
             messagebox.showerror("Error", "Invalid admin password")
             return
 
@@ -5,6 +5,7 @@ Handles barcode creation, validation, and printing for Mona Beauty Store
 """
 
 import os
+import secrets
 import sys
 from datetime import datetime
 from pathlib import Path
@@ -67,11 +68,9 @@ class BarcodeGenerator:
                 sku = f"{name_part}-{timestamp}"
             
             # Generate barcode (numeric for better scanner compatibility)
-            # Use timestamp + hash for unique numeric barcode
-            import hashlib
-            hash_obj = hashlib.md5(sku.encode())
-            hash_hex = hash_obj.hexdigest()[:8]
-            barcode_num = str(int(hash_hex, 16))[:12].zfill(12)
+            # Random 12 digits: an MD5 of the SKU gave the same barcode to
+            # same-named products added on the same day
+            barcode_num = f"{secrets.randbelow(10**12):012d}"
             
             return sku, barcode_num
             
@@ -206,21 +205,42 @@ class BarcodeGenerator:
                 return [], "No products found"
             
             generated_barcodes = []
-            
+            new_barcodes = []
+            to_render = []
+
+            # Codes already in use; barcode is UNIQUE, so new codes must avoid them
+            taken = {product[3].strip() for product in products if product[3]}
+
             for product in products:
-                product_id, name, sku, barcode, category_id, cogs, current_stock = product[:7]
+                # get_products() already joins in the category name
+                product_id, name, sku, barcode, category_name, cogs, current_stock = product[:7]
                 
                 # Use existing barcode or generate new one
                 if not barcode or barcode.strip() == "":
-                    # Generate new barcode
-                    category_name = self.get_category_name(category_id) if self.db_manager else ""
+                    # Generate new barcode (random, so just draw again on a clash)
                     new_sku, new_barcode = self.generate_sku_barcode(name, category_name)
+                    while new_barcode in taken:
+                        new_sku, new_barcode = self.generate_sku_barcode(name, category_name)
+                    taken.add(new_barcode)
                     
-                    # Update database with new barcode
-                    if self.db_manager:
-                        self.db_manager.update_product_barcode(product_id, new_barcode)
+                    # Queue database update, written in one transaction below
+                    new_barcodes.append((product_id, new_barcode))
                     
                     barcode = new_barcode
+
+                to_render.append((product_id, name, sku, barcode))
+
+            # Store new codes before drawing images, so only stored codes get a PNG
+            failed_ids = set()
+            if new_barcodes and self.db_manager:
+                if not self.db_manager.update_product_barcodes(new_barcodes):
+                    # One clash rolls the whole batch back; save row by row instead
+                    failed_ids = {product_id for product_id, new_barcode in new_barcodes
+                                  if not self.db_manager.update_product_barcode(product_id, new_barcode)}
+
+            for product_id, name, sku, barcode in to_render:
+                if product_id in failed_ids:
+                    continue
                 
                 # Generate barcode image
                 image_path, message = self.generate_barcode_image(barcode)
@@ -234,7 +254,10 @@ class BarcodeGenerator:
                         'image_path': image_path
                     })
             
-            return generated_barcodes, f"Generated {len(generated_barcodes)} barcodes"
+            message = f"Generated {len(generated_barcodes)} barcodes"
+            if failed_ids:
+                message += f" ({len(failed_ids)} could not be saved - barcode already in use)"
+            return generated_barcodes, message
             
         except Exception as e:
             return [], f"Error generating product barcodes: {str(e)}"
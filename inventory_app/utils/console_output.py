@@ -0,0 +1,30 @@
+"""
+Console Output Helpers for the test and demo scripts
+Buffers report lines so each section is written with one stdout call
+"""
+
+import sys
+
+
+class Printer:
+    """Collects output lines and writes them with a single stdout call"""
+
+    def __init__(self):
+        self.lines = []
+
+    def __call__(self, text=""):
+        self.lines.append(str(text))
+
+    def flush(self):
+        """Write the buffered lines now; call before code that prints on its own"""
+        if self.lines:
+            sys.stdout.write("\n".join(self.lines) + "\n")
+            sys.stdout.flush()
+            self.lines.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+        return False
@@ -10,6 +10,9 @@ from PIL import Image
 import re
 from typing import Optional, List, Tuple
 
+# Alphanumeric inventory codes accepted in addition to the standard symbologies
+ALPHANUMERIC_BARCODE_RE = re.compile(r'^[A-Za-z0-9\-_]{8,20}$')
+
 class ProductionBarcodeScanner:
     """Production-grade barcode scanner with multiple detection methods"""
     
@@ -28,6 +31,7 @@ class ProductionBarcodeScanner:
             'CODE_128': r'^[\x00-\x7F]{1,80}$',
             'CODE_39': r'^[A-Z0-9\-\.\ \$\/\+\%]{1,43}$'
         }
+        self._compiled_patterns = [re.compile(pattern) for pattern in self.barcode_patterns.values()]
     
     def _test_libraries(self):
         """Test which libraries are available"""
@@ -84,6 +88,12 @@ class ProductionBarcodeScanner:
             print(f"❌ Scan error: {e}")
             return None
     
+    def _to_gray(self, frame):
+        """Return a single-channel view of the frame, converting only BGR input"""
+        if frame.ndim == 2:
+            return frame
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    
     def _scan_with_pyzbar(self, frame) -> Optional[str]:
         """Scan using pyzbar library"""
         try:
@@ -113,7 +123,7 @@ class ProductionBarcodeScanner:
                 return None
             
             # Convert to grayscale
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            gray = self._to_gray(frame)
             
             # Apply multiple enhancement techniques
             enhanced_frames = self._enhance_frame(gray)
@@ -137,8 +147,9 @@ class ProductionBarcodeScanner:
             
             if self.opencv_available:
                 # Convert to grayscale
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                preprocessed.append(gray)
+                gray = self._to_gray(frame)
+                if gray is not frame:
+                    preprocessed.append(gray)
                 
                 # Apply threshold
                 _, thresh = cv2.threshold(gray, 127, 255, cv2.THRESH_BINARY)
@@ -363,7 +374,7 @@ class ProductionBarcodeScanner:
                 return None
             
             # Convert to grayscale
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            gray = self._to_gray(frame)
             
             # Apply threshold for text detection
             _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
@@ -384,12 +395,12 @@ class ProductionBarcodeScanner:
                 return False
             
             # Check against known barcode patterns
-            for pattern_name, pattern in self.barcode_patterns.items():
-                if re.match(pattern, barcode):
+            for pattern in self._compiled_patterns:
+                if pattern.match(barcode):
                     return True
             
             # Allow alphanumeric codes (common in inventory systems)
-            if re.match(r'^[A-Za-z0-9\-_]{8,20}$', barcode):
+            if ALPHANUMERIC_BARCODE_RE.match(barcode):
                 return True
             
             return False
@@ -23,6 +23,9 @@ class ProfessionalQRScanner:
         self.opencv_available = self._test_opencv()
         self.pyzbar_available = self._test_pyzbar()
 
+        # One detector instance is reused for every frame
+        self.qr_detector = cv2.QRCodeDetector() if self.opencv_available else None
+
         print(f"🔧 QR Scanner initialized - OpenCV: {self.opencv_available}, pyzbar: {self.pyzbar_available}")
 
     def _test_opencv(self) -> bool:
@@ -82,7 +85,7 @@ class ProfessionalQRScanner:
     def _scan_with_opencv_qr(self, frame) -> Optional[str]:
         """Scan using OpenCV's built-in QR detector"""
         try:
-            detector = cv2.QRCodeDetector()
+            detector = self.qr_detector
 
             # Try original frame
             data, bbox, _ = detector.detectAndDecode(frame)
@@ -111,25 +114,23 @@ class ProfessionalQRScanner:
     def _scan_with_pyzbar(self, frame) -> Optional[str]:
         """Scan using pyzbar (supports QR codes)"""
         try:
-            from pyzbar import pyzbar
+            from pyzbar.pyzbar import decode, ZBarSymbol
 
-            # Try original frame
-            decoded_objects = pyzbar.decode(frame)
+            # Try original frame (QR symbology only, so ZBar skips the 1D decoders)
+            decoded_objects = decode(frame, symbols=[ZBarSymbol.QRCODE])
             for obj in decoded_objects:
-                if obj.type == 'QRCODE':
-                    data = obj.data.decode('utf-8')
-                    if self._is_valid_qr_data(data):
-                        return data
+                data = obj.data.decode('utf-8')
+                if self._is_valid_qr_data(data):
+                    return data
 
             # Try grayscale
             if len(frame.shape) == 3:
                 gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                decoded_objects = pyzbar.decode(gray)
+                decoded_objects = decode(gray, symbols=[ZBarSymbol.QRCODE])
                 for obj in decoded_objects:
-                    if obj.type == 'QRCODE':
-                        data = obj.data.decode('utf-8')
-                        if self._is_valid_qr_data(data):
-                            return data
+                    data = obj.data.decode('utf-8')
+                    if self._is_valid_qr_data(data):
+                        return data
 
             return None
 
@@ -152,7 +153,7 @@ class ProfessionalQRScanner:
                 lambda img: self._morphological_operations(img),  # Morphological operations
             ]
 
-            detector = cv2.QRCodeDetector()
+            detector = self.qr_detector
 
             for method in preprocessing_methods:
                 try:
@@ -32,6 +32,15 @@ except ImportError:
     PDF_AVAILABLE = False
     print("⚠️ reportlab not available - PDF generation disabled")
 
+# Pre-resized copies for the QR popup, kept beside the full-size images
+THUMBNAIL_SIZE = (400, 400)
+
+
+def thumbnail_path(image_path):
+    """Get the cached popup thumbnail path for a generated QR image"""
+    image_path = Path(image_path)
+    return image_path.parent / "thumbs" / image_path.name
+
 class QRGenerator:
     """Production-grade QR code generation system"""
 
@@ -39,6 +48,7 @@ class QRGenerator:
         self.db_manager = db_manager
         self.qr_dir = Path("generated_barcodes")  # Use same directory for consistency
         self.qr_dir.mkdir(exist_ok=True)
+        self._generated = {}  # {(qr_data, include_text, border): image path} made by this generator
 
         # Mona Beauty Store branding colors
         self.brand_colors = {
@@ -50,13 +60,14 @@ class QRGenerator:
 
     def generate_sku_qr_code(self, product_name, category=""):
         """Generate unique SKU/QR code for new products"""
+        now = datetime.now()
         try:
             # Create SKU based on product name and category
             name_part = ''.join(filter(str.isalnum, product_name))[:8].upper()
             category_part = ''.join(filter(str.isalnum, category))[:3].upper()
 
             # Add timestamp for uniqueness
-            timestamp = datetime.now().strftime("%m%d")
+            timestamp = now.strftime("%m%d")
 
             # Generate SKU: CATEGORY-NAME-TIMESTAMP
             if category_part:
@@ -66,14 +77,14 @@ class QRGenerator:
 
             # Generate QR code data (can be alphanumeric for better readability)
             # Use SKU with additional product info
-            qr_data = f"MONA-{sku}-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+            qr_data = f"MONA-{sku}-{now.strftime('%Y%m%d%H%M%S')}"
 
             return sku, qr_data
 
         except Exception as e:
             print(f"Error generating SKU/QR code: {e}")
             # Fallback to simple timestamp-based generation
-            timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+            timestamp = now.strftime("%Y%m%d%H%M%S")
             return f"PROD-{timestamp}", f"MONA-{timestamp}"
 
     def validate_qr_format(self, qr_data):
@@ -112,6 +123,12 @@ class QRGenerator:
             if not valid:
                 return None, message
 
+            # Same payload and options render the same image; reuse it while the file exists
+            cache_key = (qr_data, include_text, border)
+            cached_path = self._generated.get(cache_key)
+            if cached_path and os.path.exists(cached_path):
+                return cached_path, "QR code generated successfully"
+
             # Create QR code object with high error correction
             qr = qrcode.QRCode(
                 version=None,  # Auto-size
@@ -142,11 +159,24 @@ class QRGenerator:
             if include_text:
                 self.add_branding_to_qr(str(filepath), qr_data)
 
+            self.save_thumbnail(filepath)
+
+            self._generated[cache_key] = str(filepath)
             return str(filepath), "QR code generated successfully"
 
         except Exception as e:
             return None, f"Error generating QR code: {str(e)}"
 
+    def save_thumbnail(self, image_path):
+        """Save the popup-sized copy of a generated QR image"""
+        try:
+            thumb_path = thumbnail_path(image_path)
+            thumb_path.parent.mkdir(exist_ok=True)
+            with Image.open(image_path) as img:
+                img.resize(THUMBNAIL_SIZE, Image.Resampling.BILINEAR).save(thumb_path)
+        except Exception as e:
+            print(f"Error saving QR thumbnail: {e}")
+
     def add_branding_to_qr(self, image_path, qr_data):
         """Add Mona Beauty Store branding to QR code image"""
         try:
@@ -203,22 +233,47 @@ class QRGenerator:
                 return [], "No products found"
 
             generated_qr_codes = []
+            new_qr_codes = []
+            to_render = []
+
+            # Codes already in use; barcode is UNIQUE, so new codes must avoid them
+            taken = {product[3].strip() for product in products if product[3]}
 
             for product in products:
-                product_id, name, sku, qr_code, category_id, cogs, current_stock = product[:7]
+                # get_products() already joins in the category name
+                product_id, name, sku, qr_code, category_name, cogs, current_stock = product[:7]
 
                 # Use existing QR code or generate new one
                 if not qr_code or qr_code.strip() == "":
                     # Generate new QR code
-                    category_name = self.get_category_name(category_id) if self.db_manager else ""
                     new_sku, new_qr_code = self.generate_sku_qr_code(name, category_name)
 
-                    # Update database with new QR code
-                    if self.db_manager:
-                        self.db_manager.update_product_barcode(product_id, new_qr_code)
+                    # Same name prefix and category within one second give the same code
+                    base_code, suffix = new_qr_code, 2
+                    while new_qr_code in taken:
+                        new_qr_code = f"{base_code}-{suffix}"
+                        suffix += 1
+                    taken.add(new_qr_code)
+
+                    # Queue database update, written in one transaction below
+                    new_qr_codes.append((product_id, new_qr_code))
 
                     qr_code = new_qr_code
 
+                to_render.append((product_id, name, sku, qr_code))
+
+            # Store new codes before drawing images, so only stored codes get a PNG
+            failed_ids = set()
+            if new_qr_codes and self.db_manager:
+                if not self.db_manager.update_product_barcodes(new_qr_codes):
+                    # One clash rolls the whole batch back; save row by row instead
+                    failed_ids = {product_id for product_id, new_qr_code in new_qr_codes
+                                  if not self.db_manager.update_product_barcode(product_id, new_qr_code)}
+
+            for product_id, name, sku, qr_code in to_render:
+                if product_id in failed_ids:
+                    continue
+
                 # Generate QR code image
                 image_path, message = self.generate_qr_image(qr_code)
 
@@ -231,7 +286,10 @@ class QRGenerator:
                         'image_path': image_path
                     })
 
-            return generated_qr_codes, f"Generated {len(generated_qr_codes)} QR codes"
+            message = f"Generated {len(generated_qr_codes)} QR codes"
+            if failed_ids:
+                message += f" ({len(failed_ids)} could not be saved - QR code already in use)"
+            return generated_qr_codes, message
 
         except Exception as e:
             return [], f"Error generating product QR codes: {str(e)}"
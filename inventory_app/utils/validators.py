@@ -3,12 +3,26 @@ Validation Utilities for Inventory Management System
 Handles data validation and business rule checks
 """
 
+import hashlib
+import hmac
+import os
 import re
 from datetime import datetime
 
+# SHA-256 of the admin password (INV_ADMIN_PW, defaulting to the shipped one)
+ADMIN_PASSWORD_HASH = hashlib.sha256(os.environ.get('INV_ADMIN_PW', 'admin123').encode()).digest()
+
 class Validators:
     """Collection of validation functions"""
 
+    @staticmethod
+    def check_admin_password(password):
+        """Check an admin password with a constant-time hash comparison"""
+        if password is None:
+            return False  # Dialog was cancelled
+        digest = hashlib.sha256(password.encode()).digest()
+        return hmac.compare_digest(digest, ADMIN_PASSWORD_HASH)
+
     @staticmethod
     def validate_product_name(name):
         """Validate product name"""